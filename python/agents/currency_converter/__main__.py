@@ -1,11 +1,11 @@
 import logging
+import os
 
 import click
 from dotenv import load_dotenv
-from pyngrok import ngrok
 
 from agent import CurrencyAgent
-from common.server import A2AServer
+from common.server import A2AServer, RedisTaskStore
 from common.types import (
     AgentCapabilities,
     AgentCard,
@@ -21,27 +21,33 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+CAPABILITIES = AgentCapabilities(streaming=True, pushNotifications=True)
+SKILL = AgentSkill(
+    id='convert_currency',
+    name='Currency Exchange Rates Tool',
+    description='Helps with exchange values between various currencies',
+    tags=['currency conversion', 'currency exchange'],
+    examples=['What is exchange rate between USD and GBP?'],
+)
+
+
 @click.command()
 @click.option('--host', 'host', default='localhost')
 @click.option('--port', 'port', default=10000)
 @click.option('--ngrok_enabled', 'ngrok_enabled', is_flag=True,  default=False)
-def main(host, port, ngrok_enabled):
+@click.option('--workers', 'workers', default=1)
+@click.option('--redis_url', 'redis_url', envvar='REDIS_URL', default=None)
+def main(host, port, ngrok_enabled, workers, redis_url):
     """Starts the Financial Agent server."""
     try:
         agent_url = f'http://{host}:{port}/'
         if ngrok_enabled:
+            from pyngrok import ngrok
+
             ngrok_url = ngrok.connect(port)
             agent_url = ngrok_url.public_url
             logger.info(f'ngrok tunnel "{agent_url}" -> "http://{host}:{port}"')
 
-        capabilities = AgentCapabilities(streaming=True, pushNotifications=True)
-        skill = AgentSkill(
-            id='convert_currency',
-            name='Currency Exchange Rates Tool',
-            description='Helps with exchange values between various currencies',
-            tags=['currency conversion', 'currency exchange'],
-            examples=['What is exchange rate between USD and GBP?'],
-        )
         agent_card = AgentCard(
             name='Currency Agent',
             description='Helps with exchange rates for currencies',
@@ -49,8 +55,8 @@ def main(host, port, ngrok_enabled):
             version='1.0.0',
             defaultInputModes=CurrencyAgent.SUPPORTED_CONTENT_TYPES,
             defaultOutputModes=CurrencyAgent.SUPPORTED_CONTENT_TYPES,
-            capabilities=capabilities,
-            skills=[skill],
+            capabilities=CAPABILITIES,
+            skills=[SKILL],
         )
 
         notification_sender_auth = PushNotificationSenderAuth()
@@ -60,9 +66,11 @@ def main(host, port, ngrok_enabled):
             task_manager=AgentTaskManager(
                 agent=CurrencyAgent(),
                 notification_sender_auth=notification_sender_auth,
+                task_store=RedisTaskStore(redis_url) if redis_url else None,
             ),
             host=host,
             port=port,
+            workers=workers,
         )
 
         server.app.add_route(
@@ -75,10 +83,20 @@ def main(host, port, ngrok_enabled):
         server.start()
     except MissingAPIKeyError as e:
         logger.error(f'Error: {e}')
-        exit(1)
+        _abort(ngrok_enabled)
     except Exception as e:
         logger.error(f'An error occurred during server startup: {e}')
-        exit(1)
+        _abort(ngrok_enabled)
+
+
+def _abort(ngrok_enabled):
+    """Exits right away, without the slow interpreter teardown."""
+    if ngrok_enabled:
+        from pyngrok import ngrok
+
+        ngrok.kill()
+    logging.shutdown()
+    os._exit(1)
 
 
 if __name__ == '__main__':
@@ -1,65 +1,236 @@
 import logging
+import threading
 
+from collections import defaultdict
 from collections.abc import AsyncIterable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Literal
 
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import ToolMessage
 from langchain_core.tools import tool
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 
+from common.utils.bounded_memory_saver import BoundedMemorySaver
 from common.utils.chat_model_factory import create_chat_model
+from common.utils.stream_coalescer import coalesce_updates
+from common.utils.ttl_cache import TTLCache
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-memory = MemorySaver()
+memory = BoundedMemorySaver()
 
+# Quotes and news change quickly, statements and price history do not.
+VOLATILE_DATA_TTL = 300
+VOLATILE_DATA_CACHE_SIZE = 1024
+STABLE_DATA_TTL = 3600
+STABLE_DATA_CACHE_SIZE = 512
+# Dashboards tend to repeat the same question, answer it again from cache.
+RESPONSE_TTL = 30
+RESPONSE_CACHE_SIZE = 1024
 
-import yfinance as yf
+# yfinance data is cached per symbol, and per period and interval for price
+# histories, all chosen by the model, so the caches are bounded.
+volatile_data = TTLCache(maxsize=VOLATILE_DATA_CACHE_SIZE, ttl=VOLATILE_DATA_TTL)
+stable_data = TTLCache(maxsize=STABLE_DATA_CACHE_SIZE, ttl=STABLE_DATA_TTL)
+# Responses are cached per session and query, most of which are never asked
+# again, so the cache is bounded.
+responses = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_TTL)
+executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='yfinance')
+fetch_locks = defaultdict(threading.Lock)
+fetch_locks_lock = threading.Lock()
+
+
+def _cached(cache: TTLCache, kind: str, company_symbol: str, fetch):
+    """Returns yfinance data for the symbol, fetching it on a miss in cache.
+
+    Concurrent misses for the same key wait for a single fetch instead of
+    sending duplicate requests to Yahoo. A key's lock only exists while it is
+    being fetched, since keys come from the symbols and periods the model
+    asks for and their locks would otherwise pile up.
+    """
+    key = f'yfinance:{kind}:{company_symbol.upper()}'
+    data = cache.get(key)
+    if data is not None:
+        logger.info("Cache hit for %s of %s", kind, company_symbol)
+        return data
+
+    with fetch_locks_lock:
+        fetch_lock = fetch_locks[key]
+    try:
+        with fetch_lock:
+            data = cache.get(key)
+            if data is None:
+                logger.info("Cache miss for %s of %s", kind, company_symbol)
+                # yfinance pulls in pandas, import it when data is first needed.
+                import yfinance as yf
+
+                data = fetch(yf.Ticker(company_symbol))
+                cache.set(key, data)
+    finally:
+        # Misses once the data has expired create a new lock. A lock created
+        # meanwhile for another fetch of the key is left to that fetch.
+        with fetch_locks_lock:
+            if fetch_locks.get(key) is fetch_lock:
+                del fetch_locks[key]
+    return data
+
+
+def _company_info(company_symbol: str):
+    return _cached(volatile_data, 'info', company_symbol, lambda t: t.info)
+
+
+def _company_news(company_symbol: str):
+    return _cached(volatile_data, 'news', company_symbol, lambda t: t.news)
+
+
+def _company_history(company_symbol: str, period: str = '1y', interval: str = '1wk'):
+    def fetch(t):
+        # The full OHLCV frame is several KB of prompt text, the closing
+        # price and volume per date are enough to reason about the trend.
+        history = t.history(period=period, interval=interval)
+        # Bars without a closing price or volume tell nothing about the
+        # trend. Unknown and delisted symbols have no bars at all, and their
+        # empty frame does not even have a DatetimeIndex.
+        if not history.empty:
+            history = history.dropna(subset=['Close', 'Volume'])
+        if history.empty:
+            return {'date': [], 'close': [], 'volume': []}
+        return {
+            'date': history.index.strftime('%Y-%m-%d').tolist(),
+            'close': history['Close'].round(2).tolist(),
+            'volume': history['Volume'].astype(int).tolist(),
+        }
+
+    return _cached(
+        stable_data, f'history:{period}:{interval}', company_symbol, fetch
+    )
+
+
+def _compact_amount(amount: float) -> int | float:
+    # Statements are in whole currency units and are kept exact, without the
+    # trailing '.0'. Fractional amounts such as per-share figures and ratios
+    # are rounded to 7 significant figures, dropping float64 noise.
+    if amount.is_integer():
+        return int(amount)
+    return float(f'{amount:.7g}')
+
+
+def _compact_statement(statement) -> dict[str, dict[str, int | float]]:
+    """Converts a financial statement frame to {date: {line item: amount}}.
+
+    Whole amounts become ints and fractional ones are rounded to 7
+    significant figures, which is much shorter in the prompt than full
+    float64 values without losing precision the model could use.
+    """
+    return {
+        date.strftime('%Y-%m-%d'): {
+            item: _compact_amount(amount)
+            for item, amount in amounts.dropna().items()
+        }
+        for date, amounts in statement.items()
+    }
+
+
+def _company_financials(company_symbol: str):
+    def fetch(t):
+        # Each statement is a separate request to Yahoo, fetch them together.
+        balance_sheet = executor.submit(lambda: t.balance_sheet)
+        income_statement = executor.submit(lambda: t.quarterly_income_stmt)
+        return {
+            'balance_sheet': _compact_statement(balance_sheet.result()),
+            'quarterly_income_statement': _compact_statement(
+                income_statement.result()
+            ),
+        }
+
+    return _cached(stable_data, 'financials', company_symbol, fetch)
 
 @tool(
     description="Use this to get general info about the company"
 )
 def get_company_info(company_symbol: str):
-    logger.info(f"Fetching general info for {company_symbol}")
-    return yf.Ticker(company_symbol).info
+    logger.info("Fetching general info for %s", company_symbol)
+    return _company_info(company_symbol)
 
 @tool(
     description="Use this to get the company's news"
 )
 def get_company_news(company_symbol: str):
-    logger.info(f"Fetching news for {company_symbol}")
-    return yf.Ticker(company_symbol).news
+    logger.info("Fetching news for %s", company_symbol)
+    return _company_news(company_symbol)
 
 @tool(
-    description="Use this to get the company's historical market data"
+    description=(
+        "Use this to get the company's historical closing prices and volumes. "
+        "period is one of 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max; "
+        "interval is one of 1d, 1wk, 1mo."
+    )
 )
-def get_company_history(company_symbol: str):
-    logger.info(f"Fetching historical data for {company_symbol}")
-    return yf.Ticker(company_symbol).history(period="1y")
+def get_company_history(
+    company_symbol: str, period: str = '1y', interval: str = '1wk'
+):
+    logger.info(
+        "Fetching %s of %s historical data for %s",
+        period, interval, company_symbol,
+    )
+    return _company_history(company_symbol, period, interval)
 
 @tool(
     description="Use this to get the company's financials"
 )
 def get_company_financials(company_symbol: str):
-    logger.info(f"Fetching financials for {company_symbol}")
-    t = yf.Ticker(company_symbol)
+    logger.info("Fetching financials for %s", company_symbol)
+    return _company_financials(company_symbol)
+
+@tool(
+    description="Use this to get the company's general info, news, historical market data and financials at once"
+)
+def get_company_bundle(company_symbol: str):
+    logger.info("Fetching all data for %s", company_symbol)
+    info = executor.submit(_company_info, company_symbol)
+    news = executor.submit(_company_news, company_symbol)
+    history = executor.submit(_company_history, company_symbol)
+    financials = _company_financials(company_symbol)
     return {
-        'balance_sheet': t.balance_sheet,
-        'quarterly_income_statement': t.quarterly_income_stmt,
+        'info': info.result(),
+        'news': news.result(),
+        'history': history.result(),
+        'financials': financials,
     }
 
 
+# Progress updates are the same for every request, so they are built once.
+TOOL_CALL_UPDATE = {
+    'is_task_complete': False,
+    'require_user_input': False,
+    'content': 'Looking up the financial market data...',
+}
+TOOL_RESULT_UPDATE = {
+    'is_task_complete': False,
+    'require_user_input': False,
+    'content': 'Processing the financial market data...',
+}
+
+
 class ResponseFormat(BaseModel):
     """Respond to the user in this format."""
 
+    model_config = ConfigDict(frozen=True)
+
     status: Literal['input_required', 'completed', 'error'] = 'input_required'
     message: str
 
 
+# (is_task_complete, require_user_input) for each response status.
+RESPONSE_STATUS_FLAGS = {
+    'input_required': (False, True),
+    'error': (False, True),
+    'completed': (True, False),
+}
+
+
 class FinancialAgent:
     SYSTEM_INSTRUCTION = """
 You are a specialized assistant for financial market data analysis.
@@ -73,69 +244,98 @@ Other Instructions:
 - Set response status to completed if the request is complete.
 """
 
+    # The model client and compiled graph are stateless between requests
+    # (conversations live in the checkpointer), so instances share them.
+    _model = None
+    _graph = None
+
     def __init__(self):
-        self.model = create_chat_model()
-        self.tools = [get_company_info, get_company_news, get_company_history, get_company_financials]
-
-        self.graph = create_react_agent(
-            self.model,
-            tools=self.tools,
-            checkpointer=memory,
-            prompt=self.SYSTEM_INSTRUCTION,
-            response_format=ResponseFormat,
-        )
-
-    def invoke(self, query, sessionId) -> str:
+        self.tools = [
+            get_company_info,
+            get_company_news,
+            get_company_history,
+            get_company_financials,
+            get_company_bundle,
+        ]
+
+        cls = type(self)
+        if cls._graph is None:
+            cls._model = create_chat_model()
+            cls._graph = create_react_agent(
+                cls._model,
+                tools=self.tools,
+                checkpointer=memory,
+                prompt=self.SYSTEM_INSTRUCTION,
+                response_format=ResponseFormat,
+            )
+        self.model = cls._model
+        self.graph = cls._graph
+
+    async def invoke(self, query, sessionId) -> dict[str, Any]:
+        key = self._response_cache_key(query, sessionId)
+        response = responses.get(key)
+        if response is not None:
+            logger.info("Answering repeated query in session %s from cache", sessionId)
+            return response
+
         config = {'configurable': {'thread_id': sessionId}}
-        self.graph.invoke({'messages': [('user', query)]}, config)
-        return self.get_agent_response(config)
+        await self.graph.ainvoke({'messages': [('user', query)]}, config)
+        return self._cache_response(key, await self.get_agent_response(config))
 
     async def stream(self, query, sessionId) -> AsyncIterable[dict[str, Any]]:
+        key = self._response_cache_key(query, sessionId)
+        response = responses.get(key)
+        if response is not None:
+            logger.info("Answering repeated query in session %s from cache", sessionId)
+            yield response
+            return
+
         inputs = {'messages': [('user', query)]}
         config = {'configurable': {'thread_id': sessionId}}
 
-        for item in self.graph.stream(inputs, config, stream_mode='values'):
+        async for update in coalesce_updates(
+            self._progress_updates(inputs, config)
+        ):
+            yield update
+
+        yield self._cache_response(key, await self.get_agent_response(config))
+
+    @staticmethod
+    def _response_cache_key(query: str, sessionId: str) -> str:
+        return f"response:{sessionId}:{' '.join(query.lower().split())}"
+
+    @staticmethod
+    def _cache_response(key: str, response: dict[str, Any]) -> dict[str, Any]:
+        # Only final answers are reused, a follow-up question depends on
+        # what the user replies next.
+        if response['is_task_complete']:
+            responses.set(key, response)
+        return response
+
+    async def _progress_updates(
+        self, inputs, config
+    ) -> AsyncIterable[dict[str, Any]]:
+        async for item in self.graph.astream(
+            inputs, config, stream_mode='values'
+        ):
             message = item['messages'][-1]
-            if (
-                isinstance(message, AIMessage)
-                and message.tool_calls
-                and len(message.tool_calls) > 0
-            ):
-                yield {
-                    'is_task_complete': False,
-                    'require_user_input': False,
-                    'content': 'Looking up the financial market data...',
-                }
+            if getattr(message, 'tool_calls', None):
+                yield TOOL_CALL_UPDATE
             elif isinstance(message, ToolMessage):
-                yield {
-                    'is_task_complete': False,
-                    'require_user_input': False,
-                    'content': 'Processing the financial market data...',
-                }
-
-        yield self.get_agent_response(config)
+                yield TOOL_RESULT_UPDATE
 
-    def get_agent_response(self, config):
-        current_state = self.graph.get_state(config)
+    async def get_agent_response(self, config):
+        current_state = await self.graph.aget_state(config)
         structured_response = current_state.values.get('structured_response')
-        if structured_response and isinstance(
-            structured_response, ResponseFormat
-        ):
-            if (
-                structured_response.status == 'input_required'
-                or structured_response.status == 'error'
-            ):
-                return {
-                    'is_task_complete': False,
-                    'require_user_input': True,
-                    'content': structured_response.message,
-                }
-            if structured_response.status == 'completed':
-                return {
-                    'is_task_complete': True,
-                    'require_user_input': False,
-                    'content': structured_response.message,
-                }
+        if isinstance(structured_response, ResponseFormat):
+            is_task_complete, require_user_input = RESPONSE_STATUS_FLAGS[
+                structured_response.status
+            ]
+            return {
+                'is_task_complete': is_task_complete,
+                'require_user_input': require_user_input,
+                'content': structured_response.message,
+            }
 
         return {
             'is_task_complete': False,
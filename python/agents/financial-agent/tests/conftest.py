@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The agent is run from its own directory, with the python directory on the
+# path for the common package.
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [AGENT_DIR, os.path.dirname(os.path.dirname(AGENT_DIR))]
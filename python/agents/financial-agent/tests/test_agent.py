@@ -0,0 +1,99 @@
+import math
+
+import pandas as pd
+import pytest
+import yfinance
+
+from yfinance.utils import empty_df
+
+import agent
+
+
+class FakeTicker:
+    """Stands in for yfinance.Ticker, returning the given price history."""
+
+    def __init__(self, history: pd.DataFrame):
+        self._history = history
+        self.info = {}
+        self.news = []
+        self.balance_sheet = pd.DataFrame()
+        self.quarterly_income_stmt = pd.DataFrame()
+
+    def history(self, period: str, interval: str) -> pd.DataFrame:
+        return self._history
+
+
+@pytest.fixture
+def ticker_history(monkeypatch):
+    """Sets the price history returned for any symbol."""
+
+    def set_history(history: pd.DataFrame):
+        monkeypatch.setattr(
+            yfinance, 'Ticker', lambda company_symbol: FakeTicker(history)
+        )
+
+    monkeypatch.setattr(agent, 'volatile_data', agent.TTLCache(maxsize=8, ttl=60))
+    monkeypatch.setattr(agent, 'stable_data', agent.TTLCache(maxsize=8, ttl=60))
+    return set_history
+
+
+def test_company_history_of_unknown_symbol_is_empty(ticker_history):
+    # yfinance returns an empty frame without a DatetimeIndex for unknown or
+    # delisted symbols.
+    ticker_history(empty_df())
+
+    assert agent._company_history('UNKNOWN') == {
+        'date': [], 'close': [], 'volume': []
+    }
+    assert agent.get_company_bundle.invoke(
+        {'company_symbol': 'UNKNOWN'}
+    )['history'] == {'date': [], 'close': [], 'volume': []}
+
+
+def test_company_history_skips_bars_without_volume(ticker_history):
+    ticker_history(pd.DataFrame(
+        {'Close': [10.123, 11.0, 12.5], 'Volume': [100.0, math.nan, 300.0]},
+        index=pd.DatetimeIndex(['2025-01-06', '2025-01-13', '2025-01-20']),
+    ))
+
+    assert agent._company_history('ACME') == {
+        'date': ['2025-01-06', '2025-01-20'],
+        'close': [10.12, 12.5],
+        'volume': [100, 300],
+    }
+
+
+def test_response_cache_drops_the_least_recently_used_response(monkeypatch):
+    monkeypatch.setattr(agent, 'responses', agent.TTLCache(maxsize=2, ttl=60))
+    for query in ('first', 'second', 'third'):
+        agent.FinancialAgent._cache_response(
+            agent.FinancialAgent._response_cache_key(query, 'session-1'),
+            {'is_task_complete': True, 'content': query},
+        )
+
+    assert len(agent.responses) == 2
+    assert agent.responses.get('response:session-1:first') is None
+    assert agent.responses.get('response:session-1:third')['content'] == 'third'
+
+
+def test_fetch_locks_are_dropped_once_fetched(ticker_history):
+    ticker_history(empty_df())
+
+    for i in range(10):
+        agent._company_history(f'SYMBOL{i}')
+
+    assert not agent.fetch_locks
+
+
+def test_compact_statement_keeps_the_amounts_precise():
+    statement = pd.DataFrame(
+        {pd.Timestamp('2024-12-31'): [391035000000.0, 6.0753, math.nan]},
+        index=['Total Revenue', 'Diluted EPS', 'Unusual Items'],
+    )
+
+    compact = agent._compact_statement(statement)
+
+    assert compact == {
+        '2024-12-31': {'Total Revenue': 391035000000, 'Diluted EPS': 6.0753}
+    }
+    assert isinstance(compact['2024-12-31']['Total Revenue'], int)
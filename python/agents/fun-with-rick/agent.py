@@ -3,26 +3,50 @@ import logging
 from collections.abc import AsyncIterable
 from typing import Any, Literal
 
-from langchain_core.messages import AIMessage, ToolMessage
-from pydantic import BaseModel
+from langchain_core.messages import ToolMessage
+from pydantic import BaseModel, ConfigDict
 
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 
+from common.utils.bounded_memory_saver import BoundedMemorySaver
 from common.utils.chat_model_factory import create_chat_model
+from common.utils.stream_coalescer import coalesce_updates
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-memory = MemorySaver()
+memory = BoundedMemorySaver()
+
+
+# Progress updates are the same for every request, so they are built once.
+TOOL_CALL_UPDATE = {
+    'is_task_complete': False,
+    'require_user_input': False,
+    'content': 'Looking up the fun stuff...',
+}
+TOOL_RESULT_UPDATE = {
+    'is_task_complete': False,
+    'require_user_input': False,
+    'content': 'Processing the fun stuff...',
+}
 
 
 class ResponseFormat(BaseModel):
     """Respond to the user in this format."""
+
+    model_config = ConfigDict(frozen=True)
+
     status: Literal['input_required', 'completed', 'error'] = 'input_required'
     message: str
 
 
+# (is_task_complete, require_user_input) for each response status.
+RESPONSE_STATUS_FLAGS = {
+    'input_required': (False, True),
+    'error': (False, True),
+    'completed': (True, False),
+}
+
+
 class FunWithRickAgent:
     SYSTEM_INSTRUCTION = """
 Your name is Dr. Alexandria "Morty" Schmidt.
@@ -74,69 +98,67 @@ Other Instructions:
 - Use the 'tavily_search_tool' tool to answer questions about the current rating, recent comments, and people reactions.
 """
 
+    # The model client and compiled graph are stateless between requests
+    # (conversations live in the checkpointer), so instances share them.
+    _model = None
+    _graph = None
+
     def __init__(self):
-        self.model = create_chat_model()
         self.tools = []
 
-        self.graph = create_react_agent(
-            self.model,
-            tools=self.tools,
-            checkpointer=memory,
-            prompt=self.SYSTEM_INSTRUCTION,
-            response_format=ResponseFormat,
-        )
-
-    def invoke(self, query, sessionId) -> str:
+        cls = type(self)
+        if cls._graph is None:
+            cls._model = create_chat_model()
+            cls._graph = create_react_agent(
+                cls._model,
+                tools=self.tools,
+                checkpointer=memory,
+                prompt=self.SYSTEM_INSTRUCTION,
+                response_format=ResponseFormat,
+            )
+        self.model = cls._model
+        self.graph = cls._graph
+
+    async def invoke(self, query, sessionId) -> dict[str, Any]:
         config = {'configurable': {'thread_id': sessionId}}
-        self.graph.invoke({'messages': [('user', query)]}, config)
-        return self.get_agent_response(config)
+        await self.graph.ainvoke({'messages': [('user', query)]}, config)
+        return await self.get_agent_response(config)
 
     async def stream(self, query, sessionId) -> AsyncIterable[dict[str, Any]]:
         inputs = {'messages': [('user', query)]}
         config = {'configurable': {'thread_id': sessionId}}
 
-        for item in self.graph.stream(inputs, config, stream_mode='values'):
+        async for update in coalesce_updates(
+            self._progress_updates(inputs, config)
+        ):
+            yield update
+
+        yield await self.get_agent_response(config)
+
+    async def _progress_updates(
+        self, inputs, config
+    ) -> AsyncIterable[dict[str, Any]]:
+        async for item in self.graph.astream(
+            inputs, config, stream_mode='values'
+        ):
             message = item['messages'][-1]
-            if (
-                isinstance(message, AIMessage)
-                and message.tool_calls
-                and len(message.tool_calls) > 0
-            ):
-                yield {
-                    'is_task_complete': False,
-                    'require_user_input': False,
-                    'content': 'Looking up the fun stuff...',
-                }
+            if getattr(message, 'tool_calls', None):
+                yield TOOL_CALL_UPDATE
             elif isinstance(message, ToolMessage):
-                yield {
-                    'is_task_complete': False,
-                    'require_user_input': False,
-                    'content': 'Processing the fun stuff...',
-                }
-
-        yield self.get_agent_response(config)
+                yield TOOL_RESULT_UPDATE
 
-    def get_agent_response(self, config):
-        current_state = self.graph.get_state(config)
+    async def get_agent_response(self, config):
+        current_state = await self.graph.aget_state(config)
         structured_response = current_state.values.get('structured_response')
-        if structured_response and isinstance(
-            structured_response, ResponseFormat
-        ):
-            if (
-                structured_response.status == 'input_required'
-                or structured_response.status == 'error'
-            ):
-                return {
-                    'is_task_complete': False,
-                    'require_user_input': True,
-                    'content': structured_response.message,
-                }
-            if structured_response.status == 'completed':
-                return {
-                    'is_task_complete': True,
-                    'require_user_input': False,
-                    'content': structured_response.message,
-                }
+        if isinstance(structured_response, ResponseFormat):
+            is_task_complete, require_user_input = RESPONSE_STATUS_FLAGS[
+                structured_response.status
+            ]
+            return {
+                'is_task_complete': is_task_complete,
+                'require_user_input': require_user_input,
+                'content': structured_response.message,
+            }
 
         return {
             'is_task_complete': False,
@@ -7,6 +7,7 @@ from collections.abc import AsyncIterable
 from agent import FunWithRickAgent
 from common.server import utils
 from common.server.task_manager import InMemoryTaskManager
+from common.server.task_store import TaskStore
 from common.types import (
     Artifact,
     InternalError,
@@ -38,8 +39,9 @@ class AgentTaskManager(InMemoryTaskManager):
         self,
         agent: FunWithRickAgent,
         notification_sender_auth: PushNotificationSenderAuth,
+        task_store: TaskStore | None = None,
     ):
-        super().__init__()
+        super().__init__(task_store)
         self.agent = agent
         self.notification_sender_auth = notification_sender_auth
 
@@ -157,7 +159,7 @@ class AgentTaskManager(InMemoryTaskManager):
         task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
         try:
-            agent_response = self.agent.invoke(
+            agent_response = await self.agent.invoke(
                 query, task_send_params.sessionId
             )
         except Exception as e:
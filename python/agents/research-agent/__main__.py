@@ -12,8 +12,14 @@ both synchronous requests and streaming responses for long-running research task
 Environment Variables:
     HOST: Server host address (default: localhost)
     PORT: Server port number (default: 10700)
+    WORKERS: Number of worker processes, which share nothing but the task
+        records in Redis (default: 1)
     LOG_LEVEL: Logging level (default: INFO)
     ENABLE_NGROK: Whether to enable ngrok tunneling (default: false)
+    MAX_CONCURRENT_AGENTS: Maximum number of streaming tasks run at once per
+        worker (default: 8)
+    REDIS_URL: Redis server to keep tasks in, so that they survive restarts and
+        any worker can answer tasks/get (default: tasks are kept in memory)
 
 Example:
     To start the server with default settings:
@@ -24,66 +30,124 @@ Example:
 
     To enable ngrok tunneling:
         python -m research-agent --enable-ngrok
+
+    To serve with 4 worker processes:
+        python -m research-agent --workers 4
 """
 
+import argparse
+import functools
 import logging
 import os
 import sys
 
-import click
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Final
+
 from dotenv import load_dotenv
 
-from agent import ResearchAgent, SUPPORTED_CONTENT_TYPES
-from task_manager import AgentTaskManager
-from common.server import A2AServer
 from common.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
 )
 
+# The agent and server pull in LangChain, LangGraph and uvicorn, so they are
+# imported when the server is set up rather than on every CLI invocation.
+if TYPE_CHECKING:
+    from common.server import A2AServer
 
-# Load environment variables
-load_dotenv()
 
-# Configure logging
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    level=getattr(logging, log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+def port_number(value: str) -> int:
+    """Parse a TCP port number, for use as an argparse type.
 
+    Args:
+        value: The port number as given on the command line or environment.
+
+    Returns:
+        int: The port number.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a number between 0
+            and 65535.
+    """
+    try:
+        port = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid port number: {value!r}') from None
+    if not 0 <= port <= 65535:
+        raise argparse.ArgumentTypeError(f'must be between 0 and 65535, got {port}')
+    return port
+
+
+def worker_count(value: str) -> int:
+    """Parse a number of worker processes, for use as an argparse type.
 
-def validate_port(port: int) -> bool:
-    """Validate if the specified port is available for binding.
-    
-    This function attempts to bind to the specified port on localhost to verify
-    if it's available for use. This helps prevent port conflicts during server
-    startup.
-    
     Args:
-        port: The port number to validate, must be between 0 and 65535.
-        
+        value: The number as given on the command line or environment.
+
     Returns:
-        bool: True if the port is available for binding, False otherwise.
-        
-    Example:
-        >>> validate_port(8080)
-        True
-        >>> validate_port(80)  # Might be False if port is in use
-        False
+        int: The number of workers.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive number.
     """
-    import socket
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     try:
-        sock.bind(('localhost', port))
-        sock.close()
-        return True
-    except OSError:
-        return False
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid number of workers: {value!r}') from None
+    if workers < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {workers}')
+    return workers
+
 
+def log_level(value: str) -> str:
+    """Parse a logging level name, for use as an argparse type.
+
+    Args:
+        value: The level name as given on the command line or environment,
+            in any case.
+
+    Returns:
+        str: The level name in upper case.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a logging level name.
+    """
+    level = value.upper()
+    if level not in logging.getLevelNamesMapping():
+        raise argparse.ArgumentTypeError(f'invalid logging level: {value!r}')
+    return level
 
+
+logger = logging.getLogger(__name__)
+
+
+# Agent card contents; only the URL depends on the server settings.
+_AGENT_NAME: Final[str] = "Research Assistant"
+_AGENT_VERSION: Final[str] = '1.0.0'
+_CARD_DESCRIPTION: Final[str] = (
+    "A powerful research agent that conducts thorough analysis of "
+    "topics, gathers relevant information, and presents findings in a "
+    "clear and structured manner. Capable of handling complex queries "
+    "and providing detailed, well-researched responses."
+)
+_SKILL_ID: Final[str] = 'research_agent'
+_SKILL_DESCRIPTION: Final[str] = (
+    "Provides comprehensive research services, conducting thorough "
+    "analysis of topics, gathering relevant information, and presenting "
+    "findings in a clear and structured manner. Capable of handling "
+    "complex queries and providing detailed, well-researched responses."
+)
+_SKILL_TAGS: Final[tuple[str, ...]] = ('Research', 'Analysis', 'Information Gathering')
+_SKILL_EXAMPLES: Final[tuple[str, ...]] = (
+    "What are the latest developments in quantum computing?",
+    "Analyze the impact of climate change on coastal cities",
+    "Research the history and evolution of artificial intelligence",
+)
+
+
+@functools.lru_cache(maxsize=8)
 def create_agent_card(host: str, port: int) -> AgentCard:
     """Create an AgentCard instance for the Research Agent.
     
@@ -91,13 +155,17 @@ def create_agent_card(host: str, port: int) -> AgentCard:
     Agent's capabilities, skills, and interface details. The agent card is used
     by the A2A server to advertise the agent's capabilities to other agents.
     
+    Cards are cached per host and port, so repeated calls return the same
+    instance; treat it as read-only.
+    
     Args:
         host: The host address where the agent server will be running.
         port: The port number where the agent server will be listening.
         
     Returns:
         AgentCard: A configured agent card instance containing the agent's
-            capabilities, skills, and interface details.
+            capabilities, skills, and interface details, shared between
+            callers with the same host and port.
             
     Example:
         >>> card = create_agent_card('localhost', 10700)
@@ -106,37 +174,34 @@ def create_agent_card(host: str, port: int) -> AgentCard:
         >>> print(card.capabilities.streaming)
         True
     """
-    skill = AgentSkill(
-        id='research_agent',
-        name='Research Assistant',
-        description="Provides comprehensive research services, conducting thorough "
-                   "analysis of topics, gathering relevant information, and presenting "
-                   "findings in a clear and structured manner. Capable of handling "
-                   "complex queries and providing detailed, well-researched responses.",
-        tags=['Research', 'Analysis', 'Information Gathering'],
-        examples=[
-            "What are the latest developments in quantum computing?",
-            "Analyze the impact of climate change on coastal cities",
-            "Research the history and evolution of artificial intelligence"
-        ],
+    from agent import SUPPORTED_CONTENT_TYPES
+
+    # The card is built from trusted constants, so pydantic validation is
+    # skipped.
+    skill = AgentSkill.model_construct(
+        id=_SKILL_ID,
+        name=_AGENT_NAME,
+        description=_SKILL_DESCRIPTION,
+        tags=list(_SKILL_TAGS),
+        examples=list(_SKILL_EXAMPLES),
     )
     
-    return AgentCard(
-        name="Research Assistant",
-        description="A powerful research agent that conducts thorough analysis of "
-                   "topics, gathers relevant information, and presents findings in a "
-                   "clear and structured manner. Capable of handling complex queries "
-                   "and providing detailed, well-researched responses.",
+    return AgentCard.model_construct(
+        name=_AGENT_NAME,
+        description=_CARD_DESCRIPTION,
         url=f'http://{host}:{port}/',
-        version='1.0.0',
-        defaultInputModes=SUPPORTED_CONTENT_TYPES,
-        defaultOutputModes=SUPPORTED_CONTENT_TYPES,
-        capabilities=AgentCapabilities(streaming=True),
+        version=_AGENT_VERSION,
+        defaultInputModes=list(SUPPORTED_CONTENT_TYPES),
+        defaultOutputModes=list(SUPPORTED_CONTENT_TYPES),
+        capabilities=AgentCapabilities.model_construct(streaming=True),
         skills=[skill],
     )
 
 
-def setup_server(host: str, port: int) -> A2AServer:
+def setup_server(
+    host: str, port: int, workers: int = 1, redis_url: str | None = None,
+    max_concurrent_agents: int = 8,
+) -> 'A2AServer':
     """Set up and configure the A2A server instance.
     
     This function initializes and configures the A2A server with the Research
@@ -146,42 +211,91 @@ def setup_server(host: str, port: int) -> A2AServer:
     Args:
         host: The host address where the server will bind.
         port: The port number where the server will listen.
+        workers: The number of worker processes serving requests. Each
+            worker has its own task manager and agent, with their own
+            conversations, stream subscriptions and caches.
+        redis_url: Redis server to keep tasks in, so that they survive
+            restarts and any worker can answer tasks/get for them. If None,
+            each worker keeps its tasks in memory.
+        max_concurrent_agents: The maximum number of streaming tasks each
+            worker runs at once; further tasks wait.
         
     Returns:
-        A2AServer: A configured server instance ready to start.
-        
-    Raises:
-        ValueError: If the specified port is not available for binding.
+        A2AServer: A configured server instance ready to start. Starting it
+            raises ValueError if the port is not available for binding.
         
     Example:
         >>> server = setup_server('localhost', 10700)
         >>> server.host
-        'localhost'
+        '127.0.0.1'
         >>> server.port
         10700
     """
-    if not validate_port(port):
-        raise ValueError(f"Port {port} is not available")
-        
-    # Create server
+    from agent import ResearchAgent
+    from task_manager import AgentTaskManager
+    from common.server import A2AServer, RedisTaskStore
+
+    # The agent's models share the chat model factory's HTTP clients, which
+    # keep connections to the LLM provider alive between requests.
+    agent = ResearchAgent()
+
+    # Create server. 'localhost' is bound as 127.0.0.1 explicitly, since
+    # resolving it may try IPv6 first and stall where that is unavailable;
+    # the card keeps advertising the host as given.
     server = A2AServer(
         agent_card=create_agent_card(host, port),
         task_manager=AgentTaskManager(
-            agent=ResearchAgent(),
+            agent=agent,
+            task_store=RedisTaskStore(redis_url) if redis_url else None,
+            max_concurrent_runs=max_concurrent_agents,
         ),
-        host=host,
+        host='127.0.0.1' if host == 'localhost' else host,
         port=port,
+        workers=workers,
     )
     
     return server
 
 
-@click.command()
-@click.option('--host', 'host', default=lambda: os.getenv('HOST', 'localhost'))
-@click.option('--port', 'port', type=int, default=lambda: int(os.getenv('PORT', '10700')))
-@click.option('--enable-ngrok', 'enable_ngrok', is_flag=True, 
-              default=lambda: os.getenv('ENABLE_NGROK', '').lower() == 'true')
-def main(host: str, port: int, enable_ngrok: bool) -> None:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command-line options, defaulting to the environment settings.
+    
+    The environment, including a .env file, is read here rather than on
+    import. Its values are the options' defaults, parsed by argparse only when
+    the option is not given, so a command-line option overrides an invalid
+    environment value, and invalid values are reported as usage errors.
+    
+    Args:
+        argv: The arguments to parse. If None, uses sys.argv.
+        
+    Returns:
+        argparse.Namespace: The host, port, enable_ngrok, workers, redis_url,
+            max_concurrent_agents and log_level options.
+    """
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        prog='research-agent', description='Start the Research Agent A2A server.'
+    )
+    parser.add_argument('--host', default=os.environ.get('HOST', 'localhost'))
+    parser.add_argument('--port', type=port_number,
+                        default=os.environ.get('PORT', '10700'))
+    parser.add_argument('--enable-ngrok', action='store_true',
+                        default=os.environ.get('ENABLE_NGROK', '').lower() == 'true')
+    parser.add_argument('--workers', type=worker_count,
+                        default=os.environ.get('WORKERS', '1'))
+    parser.add_argument('--redis-url', default=os.environ.get('REDIS_URL') or None)
+    parser.add_argument('--max-concurrent-agents', type=worker_count,
+                        default=os.environ.get('MAX_CONCURRENT_AGENTS', '8'))
+    parser.add_argument('--log-level', type=log_level,
+                        default=os.environ.get('LOG_LEVEL', 'INFO'))
+    return parser.parse_args(argv)
+
+
+def main(
+    host: str, port: int, enable_ngrok: bool, workers: int,
+    redis_url: str | None = None, max_concurrent_agents: int = 8,
+    log_level: str = 'INFO',
+) -> None:
     """Start the Research Agent A2A server.
     
     This is the main entry point for the Research Agent server. It handles
@@ -195,6 +309,15 @@ def main(host: str, port: int, enable_ngrok: bool) -> None:
             environment variable.
         enable_ngrok: Whether to enable ngrok tunneling. Can be set via
             --enable-ngrok or ENABLE_NGROK environment variable.
+        workers: The number of worker processes sharing the port. Can be
+            set via --workers or WORKERS environment variable.
+        redis_url: The Redis server to keep tasks in. Can be set via
+            --redis-url or REDIS_URL environment variable.
+        max_concurrent_agents: The maximum number of streaming tasks each
+            worker runs at once. Can be set via --max-concurrent-agents or
+            MAX_CONCURRENT_AGENTS environment variable.
+        log_level: The logging level name. Can be set via --log-level or
+            LOG_LEVEL environment variable.
             
     Raises:
         ValueError: If there are configuration errors (e.g., port not available).
@@ -210,30 +333,43 @@ def main(host: str, port: int, enable_ngrok: bool) -> None:
         Start server with ngrok tunneling:
             $ python -m research-agent --enable-ngrok
     """
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     server = None
     try:
-        # Validate port range
-        if not (0 <= port <= 65535):
-            raise ValueError(f"Port must be between 0 and 65535, got {port}")
-            
-        # Set up ngrok if enabled
-        if enable_ngrok:
-            from pyngrok import ngrok
-            ngrok_url = ngrok.connect(port)
-            logger.info(f'ngrok tunnel "{ngrok_url.public_url}" -> "http://{host}:{port}"')
+        # Open the ngrok tunnel, if enabled, while the server is being set
+        # up; both are slow and independent of each other.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            if enable_ngrok:
+                from pyngrok import ngrok
+                ngrok_tunnel = executor.submit(ngrok.connect, port)
+
+            server = setup_server(
+                host, port, workers, redis_url, max_concurrent_agents
+            )
+
+            if enable_ngrok:
+                ngrok_url = ngrok_tunnel.result()
+                logger.info('ngrok tunnel "%s" -> "http://%s:%d"', ngrok_url.public_url, host, port)
         
         # Start server
-        server = setup_server(host, port)
-        logger.info(f'Starting server on {host}:{port}')
+        logger.info('Starting server on %s:%d', host, port)
         server.start()
         
     except ValueError as e:
-        logger.error(f'Configuration error: {e}')
+        logger.error('Configuration error: %s', e)
         sys.exit(1)
     except Exception as e:
-        logger.error(f'An error occurred during server startup: {e}', exc_info=True)
+        # The traceback is only useful when debugging, skip formatting it
+        # otherwise.
+        logger.error(
+            'An error occurred during server startup: %s', e,
+            exc_info=logger.isEnabledFor(logging.DEBUG),
+        )
         sys.exit(1)
 
 
 if __name__ == '__main__':
-    main()
+    main(**vars(parse_args()))
@@ -11,7 +11,7 @@ Example:
         "What is the impact of climate change on biodiversity?",
         "session-123"
     )
-    print(response["content"])
+    print(response.content)
     ```
 """
 
@@ -19,34 +19,224 @@ from dataclasses import dataclass, field
 import os
 from typing import TypedDict, Dict, Any, Optional, Protocol, List
 from collections.abc import AsyncIterable
-from langchain.prompts import PromptTemplate
-from langchain.schema import HumanMessage
-from langchain.schema.runnable import RunnableConfig
-from langgraph.checkpoint.memory import MemorySaver
+from langchain.prompts import ChatPromptTemplate
+from langchain.schema.runnable import Runnable, RunnableConfig
+from common.utils.bounded_memory_saver import BoundedMemorySaver
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph
 from common.utils.chat_model_factory import create_chat_model
+from common.utils.single_flight import SingleFlight
+from common.utils.ttl_cache import TTLCache
 from dotenv import load_dotenv
 import re
 import time
 import logging
 import asyncio
+import httpx
+import threading
+import weakref
 
-load_dotenv()
-
-# Configure logging
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(
-    level=getattr(logging, log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
 # Constants
 MAX_QUERY_LENGTH = 1000  # Maximum allowed length for research queries
 MAX_SESSION_AGE_HOURS = 24  # Maximum age of session data before cleanup
-SESSION_ID_PATTERN = re.compile(r'^[a-zA-Z0-9-_]{1,64}$')  # Valid session ID pattern
+MAX_SESSIONS = 10_000  # Maximum number of sessions kept in memory
+SESSION_ID_PATTERN = re.compile(r'[a-zA-Z0-9_-]{1,64}')  # Valid session ID pattern, matched in full
 SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']  # Supported content types for responses
+REPORT_NODES = frozenset({'node_analyst', 'node_research_and_analysis'})  # Nodes whose output is streamed
+FINDINGS_NODES = frozenset({'node_researcher'})  # Nodes whose intermediate findings are streamed
+TOPIC_CACHE_TTL = 3600  # Time in seconds to reuse the topic extracted from a query
+TOPIC_CACHE_SIZE = 5000  # Maximum number of queries whose extracted topic is kept
+SKIP_EXTRACTION_WORD_LIMIT = 5  # Short queries up to this many words are used as the topic
+INTERROGATIVE_PATTERN = re.compile(
+    r'\s*(what|how|why|when|where|who|which|is|are|do|does|can|could)\b', re.IGNORECASE
+)  # Queries phrased as a question still go through topic extraction
+
+# Topics extracted from queries, dropping the least recently used beyond
+# TOPIC_CACHE_SIZE queries.
+topic_cache = TTLCache(maxsize=TOPIC_CACHE_SIZE, ttl=TOPIC_CACHE_TTL)
+
+# Prompt templates for the workflow nodes, compiled once at import time
+TOPIC_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([(
+    "human",
+    """
+    Extract the topic to conduct a research from the following query:
+    {user_query}
+    
+    Topic:
+    """
+)])
+
+SUBTOPIC_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([(
+    "human",
+    """
+    Extract the topic to conduct a research from the following query:
+    {user_query}
+    
+    Then break the topic down into at most {max_subtopics} sub-topics that can be researched independently.
+    Answer with the topic on the first line, followed by one sub-topic per line, each starting with "- ".
+    
+    Topic:
+    """
+)])
+
+# The instructions come first as a static system message, and the topic and
+# findings last, so that providers with prompt caching can reuse the prefix.
+RESEARCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """
+    You are an experienced research specialist with a talent for finding relevant information from various sources.
+    You excel at organizing information in a clear and structured manner, making complex topics accessible to others.
+    
+    Your goal:
+    Find comprehensive and accurate information about the research topic with a focus on recent developments and key insights.
+    The research topic may be given as the user's question or request; research the subject it is about.
+    
+    Your task:
+    Conduct thorough research on the research topic. Focus on:
+        1. Key concepts and definitions
+        2. Historical development and recent trends
+        3. Major challenges and opportunities
+        4. Notable applications or case studies
+        5. Future outlook and potential developments
+    Make sure to organize your findings in a structured format with clear sections.
+    
+    Expected output:
+    A comprehensive research document with well-organized sections covering all the requested aspects of the research topic.
+    Include specific facts, figures, and examples where relevant.
+    """),
+    ("human", """
+    Research topic: {research_topic}
+    
+    Your research findings:
+    """),
+])
+
+# The aspects covered by RESEARCH_PROMPT, researched one per call with
+# AgentConfig.parallel_aspects.
+RESEARCH_ASPECTS = (
+    "Key concepts and definitions",
+    "Historical development and recent trends",
+    "Major challenges and opportunities",
+    "Notable applications or case studies",
+    "Future outlook and potential developments",
+)
+
+ASPECT_RESEARCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """
+    You are an experienced research specialist with a talent for finding relevant information from various sources.
+    You excel at organizing information in a clear and structured manner, making complex topics accessible to others.
+    
+    Your task:
+    Research a single aspect of the research topic, with a focus on recent developments and key insights.
+    The research topic may be given as the user's question or request; research the subject it is about.
+    Other aspects of the topic are researched separately, so cover only the given aspect.
+    
+    Expected output:
+    Concise, well-organized findings on the aspect, without a title.
+    Include specific facts, figures, and examples where relevant.
+    """),
+    ("human", """
+    Research topic: {research_topic}
+    Aspect: {aspect}
+    
+    Your research findings:
+    """),
+])
+
+ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """
+    You are a skilled data analyst and report writer with a background in data interpretation and technical writing.
+    You have a talent for identifying patterns and extracting meaningful insights from research data,
+    then communicating those insights effectively through well-crafted reports.
+    
+    Your task:
+    Analyze the research findings and create a comprehensive, well-structured report on the research topic that presents insights in a clear and engaging way.
+    The report should:
+        1. Be titled
+        2. Begin with an executive summary
+        3. Include all key information from the research
+        4. Provide insightful analysis of trends and patterns
+        5. Offer recommendations or future considerations
+        6. Be formatted in a professional, easy-to-read style with clear headings
+    """),
+    ("human", """
+    Research topic: {research_topic}
+    
+    Research findings to analyze:
+    {research_findings}
+    
+    Research report:
+    """),
+])
+
+RESEARCH_AND_ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """
+    You are an experienced research specialist and report writer.
+    You excel at finding relevant information, identifying patterns and extracting meaningful insights,
+    then communicating those insights effectively through well-crafted reports.
+    
+    Your task:
+    The research topic may be given as the user's question or request; research the subject it is about.
+    First research the research topic thoroughly, covering:
+        1. Key concepts and definitions
+        2. Historical development and recent trends
+        3. Major challenges and opportunities
+        4. Notable applications or case studies
+        5. Future outlook and potential developments
+    Use specific facts, figures, and examples where relevant.
+    
+    Then analyze your findings and write a comprehensive, well-structured report on the research topic.
+    The report should:
+        1. Be titled
+        2. Begin with an executive summary
+        3. Include all key information from the research
+        4. Provide insightful analysis of trends and patterns
+        5. Offer recommendations or future considerations
+        6. Be formatted in a professional, easy-to-read style with clear headings
+    
+    Output only the final report, not the intermediate research notes.
+    """),
+    ("human", """
+    Research topic: {research_topic}
+    
+    Research report:
+    """),
+])
+
+def _agent_node(name: str):
+    """Return a workflow node that runs the named method of the run's agent.
+    
+    The agent is taken from the run config, so that one compiled workflow can
+    serve every ResearchAgent instance.
+    """
+    async def node(state: "ResearchState", config: RunnableConfig) -> Dict[str, Any]:
+        return await getattr(config["configurable"]["agent"], name)(state)
+    
+    return node
+
+_invoke_loop: Optional[asyncio.AbstractEventLoop] = None
+_invoke_loop_lock = threading.Lock()
+
+def _get_invoke_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop running the synchronous invoke() calls.
+    
+    The chat models share the async HTTP client of the chat model factory,
+    whose pooled connections belong to the loop that opened them. A new loop
+    per call would leave the next call with connections of a closed loop, so
+    all calls run on one loop, in a daemon thread started on first use.
+    """
+    global _invoke_loop
+    with _invoke_loop_lock:
+        if _invoke_loop is None:
+            _invoke_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_invoke_loop.run_forever,
+                name="research-agent-invoke",
+                daemon=True,
+            ).start()
+        return _invoke_loop
 
 class ResearchState(TypedDict):
     """State maintained throughout the research workflow.
@@ -54,19 +244,24 @@ class ResearchState(TypedDict):
     Attributes:
         user_query: The original query from the user.
         research_topic: The extracted topic to research.
-        research_findings: The findings from the research phase.
+        research_topics: The sub-topics researched independently of each other,
+            or just research_topic if the topic is not broken down.
+        research_findings: The findings from the research phase. Only set when
+            research and analysis run as separate steps (split_research).
         research_report: The final analyzed report.
         timestamp: Unix timestamp of when the state was created.
         error: Optional error message if something went wrong.
     """
     user_query: str
     research_topic: str
+    research_topics: List[str]
     research_findings: str
     research_report: str
     timestamp: float
     error: Optional[str]
 
-class AgentResponse(TypedDict):
+@dataclass(slots=True)
+class AgentResponse:
     """Response structure for the research agent.
     
     Attributes:
@@ -75,25 +270,79 @@ class AgentResponse(TypedDict):
         error: Optional error message if something went wrong.
         session_id: The session identifier for the request.
         timestamp: Unix timestamp of when the response was generated.
+        is_partial: Whether content is the next chunk of the report being
+            streamed rather than a complete message.
+        is_findings: Whether a partial chunk belongs to the intermediate
+            research findings (with split_research) rather than the report.
     """
     is_task_complete: bool
     content: str
     error: Optional[str]
     session_id: str
     timestamp: float
+    is_partial: bool = False
+    is_findings: bool = False
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentConfig:
     """Configuration for the ResearchAgent.
     
+    The configuration is immutable, so one instance can be shared between
+    agents and threads.
+    
     Attributes:
         max_query_length: Maximum allowed length for research queries.
         max_session_age_hours: Maximum age of session data before cleanup.
+        max_sessions: Maximum number of sessions kept in memory; the least
+            recently used session is dropped beyond it.
         supported_content_types: List of supported content types for responses.
+        max_concurrency: Maximum number of queries processed at once by abatch().
+        max_llm_concurrency: Maximum number of LLM requests the agent has in
+            flight at once, across all queries on an event loop, to stay
+            within the provider's rate limits. Further requests wait for a
+            slot.
+        split_research: Whether to research and analyze in two separate LLM calls,
+            keeping the intermediate findings in the state. By default a single
+            call produces the report directly, saving a round trip per query.
+        max_subtopics: Maximum number of sub-topics the topic is broken down
+            into. Sub-topics are researched concurrently and their findings
+            are analyzed together, which implies split_research. With the
+            default of 1 the topic is researched as a whole.
+        parallel_aspects: Whether to research each aspect of a topic (see
+            RESEARCH_ASPECTS) in its own, concurrent LLM call rather than all
+            of them in one. This shortens the research step at the cost of
+            more requests, and implies split_research.
+        model_per_node: Model name to use per workflow step, keyed by "topic"
+            (topic extraction), "research" (researcher) and "analyst" (the
+            report, written by the analyst or the fused research and analysis
+            step). Steps without an entry use the CHAT_MODEL default, e.g.
+            {"topic": "gpt-4o-mini", "research": "gpt-4o-mini"} keeps the
+            default model for the report only.
+        fuse_topic_extraction: Whether to leave identifying the topic to the
+            research step, which is given the query as it is, instead of
+            extracting the topic with a separate LLM call first. Breaking the
+            topic down into sub-topics (max_subtopics) still extracts it.
+        skip_extraction_word_limit: Queries of at most this many words that
+            are not phrased as a question are used as the topic as they are,
+            without asking the LLM to extract it. 0 always extracts the topic.
+        max_age_seconds: max_session_age_hours in seconds, derived on creation.
     """
     max_query_length: int = MAX_QUERY_LENGTH
     max_session_age_hours: int = MAX_SESSION_AGE_HOURS
+    max_sessions: int = MAX_SESSIONS
     supported_content_types: List[str] = field(default_factory=lambda: SUPPORTED_CONTENT_TYPES)
+    max_concurrency: int = 8
+    max_llm_concurrency: int = 8
+    split_research: bool = False
+    max_subtopics: int = 1
+    parallel_aspects: bool = False
+    model_per_node: Dict[str, str] = field(default_factory=dict)
+    fuse_topic_extraction: bool = True
+    skip_extraction_word_limit: int = SKIP_EXTRACTION_WORD_LIMIT
+    max_age_seconds: float = field(init=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'max_age_seconds', self.max_session_age_hours * 3600)
 
 class ResearchAgentProtocol(Protocol):
     """Protocol defining the interface for research agents.
@@ -105,6 +354,7 @@ class ResearchAgentProtocol(Protocol):
     
     Methods:
         invoke: Process a research query synchronously and return results.
+        ainvoke: Process a research query asynchronously and return results.
         stream: Process a research query asynchronously and stream updates.
     """
     def invoke(self, query: str, session_id: str) -> AgentResponse:
@@ -125,8 +375,28 @@ class ResearchAgentProtocol(Protocol):
             ```python
             agent = ResearchAgent()
             response = agent.invoke("climate change", "session-123")
-            if response["is_task_complete"]:
-                print(response["content"])
+            if response.is_task_complete:
+                print(response.content)
+            ```
+        """
+        ...
+    
+    async def ainvoke(self, query: str, session_id: str) -> AgentResponse:
+        """Process a research query asynchronously and return the results.
+        
+        Args:
+            query: The research query to process.
+            session_id: Unique identifier for the research session.
+            
+        Returns:
+            AgentResponse containing the research results or error information.
+            
+        Example:
+            ```python
+            agent = ResearchAgent()
+            response = await agent.ainvoke("climate change", "session-123")
+            if response.is_task_complete:
+                print(response.content)
             ```
         """
         ...
@@ -159,10 +429,10 @@ class ResearchAgentProtocol(Protocol):
         Example:
             ```python
             async for update in agent.stream("climate change", "session-123"):
-                if update["is_complete"]:
+                if update.is_task_complete:
                     print("Research complete!")
                 else:
-                    print(f"Content: {update['content']}")
+                    print(f"Content: {update.content}")
             ```
         """
         ...
@@ -175,34 +445,104 @@ class ResearchAgent:
     2. Conducts research on the topic
     3. Analyzes the findings and generates a report
     
-    The agent maintains session state and handles errors gracefully.
+    The agent maintains session state and handles errors gracefully. A session's
+    state is its workflow checkpoint in _memory, the only per-session data the
+    agent keeps: it is created on the session's first query and dropped once
+    the session is idle for max_session_age_hours, or when it is the least
+    recently used of more than max_sessions sessions.
     
     Attributes:
         config: Configuration for the agent.
         llm: Language model for processing queries.
-        _workflow: The compiled research workflow graph.
-        _memory: Memory saver for workflow state.
-        _session_states: Dictionary of active session states.
+        _workflow: The compiled research workflow graph, with this agent's
+            checkpointer.
+        _workflows: The compiled workflow graphs shared by all agents, keyed by
+            whether research and analysis are split and whether the topic is
+            extracted first.
+        _memory: Memory saver for workflow state, bounded in the number and
+            idle time of the sessions it keeps.
+        _llm_semaphores: The semaphore limiting the agent's LLM requests in
+            flight, per event loop running them.
     """
     
-    def __init__(self, config: Optional[AgentConfig] = None):
+    # The workflow topology only depends on whether research and analysis are
+    # split and whether the topic is extracted first. Nodes find their agent in
+    # the run config, so the compiled graphs are shared and each agent only
+    # adds its own checkpointer.
+    _workflows: Dict[tuple[bool, bool], Any] = {}
+    
+    def __init__(
+        self,
+        config: Optional[AgentConfig] = None,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+    ):
         """Initialize the ResearchAgent.
         
         Args:
             config: Optional configuration for the agent. If None, uses default settings.
+            http_client: Optional httpx client for sync LLM requests. If None,
+                the chat model factory's shared client is used.
+            http_async_client: Optional httpx client for async LLM requests.
+                If None, the chat model factory's shared client is used.
             
         Raises:
             RuntimeError: If the language model or workflow initialization fails.
         """
         self.config = config or AgentConfig()
-        self.llm = create_chat_model()
-        self._memory = MemorySaver()
-        self._workflow = self._create_workflow()
-        self._session_states: Dict[str, Dict[str, Any]] = {}
+        # create_chat_model() returns the same model for the same settings, so
+        # models are shared between steps and between agent instances.
+        self.llm = create_chat_model(
+            http_client=http_client, http_async_client=http_async_client
+        )
+        topic_llm, research_llm, analyst_llm = (
+            create_chat_model(
+                self.config.model_per_node.get(step),
+                http_client=http_client,
+                http_async_client=http_async_client,
+            )
+            for step in ("topic", "research", "analyst")
+        )
+        self._memory = BoundedMemorySaver(
+            max_threads=self.config.max_sessions,
+            ttl=self.config.max_age_seconds,
+        )
+        self._topic_chain = TOPIC_EXTRACTION_PROMPT | topic_llm
+        self._subtopic_chain = SUBTOPIC_EXTRACTION_PROMPT | topic_llm
+        self._research_chain = RESEARCH_PROMPT | research_llm
+        self._aspect_research_chain = ASPECT_RESEARCH_PROMPT | research_llm
+        self._analysis_chain = ANALYSIS_PROMPT | analyst_llm
+        self._research_and_analysis_chain = RESEARCH_AND_ANALYSIS_PROMPT | analyst_llm
+        # invoke() and ainvoke() may run queries in different event loops,
+        # and a semaphore can only be waited on from one loop, so there is one
+        # per loop.
+        self._llm_semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self._topic_flight = SingleFlight()
+        self._query_flight = SingleFlight()
+        topology = (
+            self.config.split_research
+            or self.config.max_subtopics > 1
+            or self.config.parallel_aspects,
+            not self.config.fuse_topic_extraction or self.config.max_subtopics > 1,
+        )
+        workflow = self._workflows.get(topology)
+        if workflow is None:
+            workflow = self._workflows[topology] = self._create_workflow(*topology)
+        self._workflow = workflow.copy(update={"checkpointer": self._memory})
     
-    def _create_workflow(self) -> StateGraph:
+    @staticmethod
+    def _create_workflow(split: bool, extract_topic: bool) -> StateGraph:
         """Create and configure the research workflow graph.
         
+        The graph has no checkpointer, and its nodes run the methods of the
+        agent passed as "agent" in the configurable part of the run config.
+        
+        Args:
+            split: Whether to research and analyze in separate nodes.
+            extract_topic: Whether to extract the topic before researching it.
+        
         Returns:
             StateGraph: A compiled workflow graph for processing research queries.
             
@@ -211,18 +551,27 @@ class ResearchAgent:
         """
         workflow = StateGraph(ResearchState)
         
-        # Add nodes to the graph
-        workflow.add_node("node_research_topic_extraction", self._research_topic_extraction_node)
-        workflow.add_node("node_researcher", self._researcher_node)
-        workflow.add_node("node_analyst", self._analyst_node)
-        
         # Configure the workflow
-        workflow.set_entry_point("node_research_topic_extraction")
-        workflow.add_edge("node_research_topic_extraction", "node_researcher")
-        workflow.add_edge("node_researcher", "node_analyst")
-        workflow.set_finish_point("node_analyst")
+        if split:
+            workflow.add_node("node_researcher", _agent_node("_researcher_node"))
+            workflow.add_node("node_analyst", _agent_node("_analyst_node"))
+            workflow.add_edge("node_researcher", "node_analyst")
+            workflow.set_finish_point("node_analyst")
+            research_node = "node_researcher"
+        else:
+            workflow.add_node("node_research_and_analysis", _agent_node("_research_and_analysis_node"))
+            workflow.set_finish_point("node_research_and_analysis")
+            research_node = "node_research_and_analysis"
+        
+        # Otherwise the research step is given the query as the topic
+        if extract_topic:
+            workflow.add_node("node_research_topic_extraction", _agent_node("_research_topic_extraction_node"))
+            workflow.add_edge("node_research_topic_extraction", research_node)
+            workflow.set_entry_point("node_research_topic_extraction")
+        else:
+            workflow.set_entry_point(research_node)
         
-        return workflow.compile(checkpointer=self._memory)
+        return workflow.compile()
     
     def _validate_input(self, query: str, session_id: str) -> Optional[str]:
         """Validate input parameters.
@@ -241,35 +590,41 @@ class ResearchAgent:
                 print(f"Validation failed: {error}")
             ```
         """
-        if not query or not query.strip():
+        # Check the length first, so oversized queries are rejected before
+        # scanning them; isspace() does not copy the query like strip() would.
+        if not query:
             return "Query cannot be empty"
         
         if len(query) > self.config.max_query_length:
             return f"Query exceeds maximum length of {self.config.max_query_length} characters"
         
-        if not SESSION_ID_PATTERN.match(session_id):
+        if query.isspace():
+            return "Query cannot be empty"
+        
+        if not SESSION_ID_PATTERN.fullmatch(session_id):
             return "Invalid session ID format"
         
         return None
     
-    def _cleanup_old_sessions(self) -> None:
-        """Remove sessions older than max_session_age_hours.
-        
-        This method helps prevent memory leaks by cleaning up old session data.
-        It's called automatically before processing new queries.
-        """
-        current_time = time.time()
-        cutoff_time = current_time - (self.config.max_session_age_hours * 3600)
-        
-        self._session_states = {
-            session_id: state 
-            for session_id, state in self._session_states.items()
-            if state.get('timestamp', 0) > cutoff_time
-        }
+    async def _call_llm(self, chain: Runnable, inputs: Dict[str, Any]) -> Any:
+        """Invoke an LLM chain once one of the agent's LLM request slots is free."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._llm_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._llm_semaphores[loop] = asyncio.Semaphore(
+                self.config.max_llm_concurrency
+            )
+        async with semaphore:
+            return await chain.ainvoke(inputs)
     
-    def _research_topic_extraction_node(self, state: ResearchState) -> Dict[str, Any]:
+    async def _research_topic_extraction_node(self, state: ResearchState) -> Dict[str, Any]:
         """Extract research topic from user query.
         
+        Short queries that are not questions (e.g. "climate change") are
+        already a topic and are used as they are. Other topics are cached by the
+        normalized query, so repeated queries skip the LLM call, and concurrent
+        identical queries share a single call.
+        
         Args:
             state: Current workflow state containing the user query.
             
@@ -279,30 +634,77 @@ class ResearchAgent:
         Raises:
             ValueError: If topic extraction fails.
         """
+        query = state["user_query"].strip()
+        if (
+            self.config.max_subtopics == 1
+            and len(query.split()) <= self.config.skip_extraction_word_limit
+            and not INTERROGATIVE_PATTERN.match(query)
+        ):
+            return {"research_topic": query, "research_topics": [query], "error": None}
+        
         try:
-            prompt = PromptTemplate(
-                input_variables=["user_query"],
-                template="""
-                Extract the topic to conduct a research from the following query:
-                {user_query}
-                
-                Topic:
-                """
-            )
-            message = HumanMessage(content=prompt.format(user_query=state["user_query"]))
-            research_topic = self.llm.invoke([message]).content.strip()
-            
-            if not research_topic:
-                raise ValueError("Failed to extract research topic")
+            normalized_query = ' '.join(state['user_query'].lower().split())
+            key = f"research:topic:{self.config.max_subtopics}:{normalized_query}"
+            topics = topic_cache.get(key)
+            if topics is None:
+                topics = await self._topic_flight.do(
+                    key, lambda: self._extract_topic(key, state["user_query"])
+                )
+            research_topic, research_topics = topics
                 
-            return {"research_topic": research_topic, "error": None}
+            return {
+                "research_topic": research_topic,
+                "research_topics": list(research_topics),
+                "error": None
+            }
         except Exception as e:
-            logger.error(f"Error in research topic extraction: {str(e)}")
-            return {"research_topic": "", "error": str(e)}
+            logger.error("Error in research topic extraction: %s", e)
+            return {"research_topic": "", "research_topics": [], "error": str(e)}
+    
+    async def _extract_topic(self, key: str, user_query: str) -> tuple[str, tuple[str, ...]]:
+        """Extract the research topic and its sub-topics with the LLM.
+        
+        The result is cached under key.
+        
+        Returns:
+            tuple[str, tuple[str, ...]]: The topic and the sub-topics to research.
+        """
+        if self.config.max_subtopics > 1:
+            response = await self._call_llm(self._subtopic_chain, {
+                "user_query": user_query,
+                "max_subtopics": self.config.max_subtopics
+            })
+            research_topic, *lines = response.content.strip().splitlines() or [""]
+            research_topic = research_topic.strip()
+            research_topics = tuple(
+                line.strip()[2:].strip() for line in lines
+                if line.strip().startswith("- ") and line.strip()[2:].strip()
+            )[:self.config.max_subtopics]
+        else:
+            response = await self._call_llm(self._topic_chain, {"user_query": user_query})
+            research_topic = response.content.strip()
+            research_topics = ()
+        
+        if not research_topic:
+            raise ValueError("Failed to extract research topic")
+        
+        topics = (research_topic, research_topics or (research_topic,))
+        topic_cache.set(key, topics)
+        return topics
+    
+    @staticmethod
+    def _research_topic(state: ResearchState) -> str:
+        """Return the extracted topic, or the query if it was not extracted."""
+        return state.get("research_topic") or state["user_query"]
     
-    def _researcher_node(self, state: ResearchState) -> Dict[str, Any]:
+    async def _researcher_node(self, state: ResearchState) -> Dict[str, Any]:
         """Conduct research on the extracted topic.
         
+        Sub-topics are researched concurrently, and their findings are joined
+        into one document with a section per sub-topic. With parallel_aspects
+        each aspect of each sub-topic is researched concurrently as well, in a
+        section of its own.
+        
         Args:
             state: Current workflow state containing the research topic.
             
@@ -316,42 +718,66 @@ class ResearchAgent:
             return state
             
         try:
-            prompt = PromptTemplate.from_template(
-                """
-                You are an experienced research specialist for {research_topic} with a talent for finding relevant information from various sources.
-                You excel at organizing information in a clear and structured manner, making complex topics accessible to others.
-                
-                Your goal:
-                Find comprehensive and accurate information about {research_topic} with a focus on recent developments and key insights.
-                
-                Your task:
-                Conduct thorough research on {research_topic}. Focus on:
-                    1. Key concepts and definitions
-                    2. Historical development and recent trends
-                    3. Major challenges and opportunities
-                    4. Notable applications or case studies
-                    5. Future outlook and potential developments
-                Make sure to organize your findings in a structured format with clear sections.
-                
-                Expected output:
-                A comprehensive research document with well-organized sections covering all the requested aspects of {research_topic}.
-                Include specific facts, figures, and examples where relevant.
-                
-                Your research findings:
-                """
-            )
-            chain = prompt | self.llm
-            response = chain.invoke({"research_topic": state["research_topic"]})
+            topics = state.get("research_topics") or [self._research_topic(state)]
+            if self.config.parallel_aspects:
+                chain = self._aspect_research_chain
+                calls = [
+                    {"research_topic": topic, "aspect": aspect}
+                    for topic in topics
+                    for aspect in RESEARCH_ASPECTS
+                ]
+            else:
+                chain = self._research_chain
+                calls = [{"research_topic": topic} for topic in topics]
             
-            if not response.content:
+            # The findings of concurrent calls are not streamed, since their
+            # tokens would arrive interleaved, so each finished call is
+            # reported to the stream instead.
+            write = get_stream_writer()
+            finished = 0
+            
+            async def research(inputs: Dict[str, Any]) -> Any:
+                nonlocal finished
+                response = await self._call_llm(chain, inputs)
+                finished += 1
+                if len(calls) > 1:
+                    write(f"Researched {finished} of {len(calls)} parts of the topic...")
+                return response
+            
+            responses = await asyncio.gather(*(research(inputs) for inputs in calls))
+            
+            if not all(response.content for response in responses):
                 raise ValueError("Failed to generate research findings")
+            
+            if self.config.parallel_aspects:
+                # Aspects are sections of their topic, one level deeper when
+                # there are several topics.
+                heading = "##" if len(topics) == 1 else "###"
+                contents = iter(response.content for response in responses)
+                documents = [
+                    "\n\n".join(
+                        f"{heading} {aspect}\n\n{next(contents)}"
+                        for aspect in RESEARCH_ASPECTS
+                    )
+                    for _ in topics
+                ]
+            else:
+                documents = [response.content for response in responses]
+            
+            if len(topics) == 1:
+                research_findings = documents[0]
+            else:
+                research_findings = "\n\n".join(
+                    f"## {topic}\n\n{document}"
+                    for topic, document in zip(topics, documents)
+                )
                 
-            return {"research_findings": response.content, "error": None}
+            return {"research_findings": research_findings, "error": None}
         except Exception as e:
-            logger.error(f"Error in researcher node: {str(e)}")
+            logger.error("Error in researcher node: %s", e)
             return {"research_findings": "", "error": str(e)}
     
-    def _analyst_node(self, state: ResearchState) -> Dict[str, Any]:
+    async def _analyst_node(self, state: ResearchState) -> Dict[str, Any]:
         """Analyze research findings and generate a report.
         
         Args:
@@ -367,31 +793,8 @@ class ResearchAgent:
             return state
             
         try:
-            prompt = PromptTemplate.from_template(
-                """
-                You are a skilled data analyst and report writer for {research_topic} with a background in data interpretation and technical writing.
-                You have a talent for identifying patterns and extracting meaningful insights from research data,
-                then communicating those insights effectively through well-crafted reports.
-                
-                Your task:
-                Analyze research findings and create a comprehensive, well-structured report on {research_topic} that presents insights in a clear and engaging way.
-                The report should:
-                    1. Be titled
-                    2. Begin with an executive summary
-                    3. Include all key information from the research
-                    4. Provide insightful analysis of trends and patterns
-                    5. Offer recommendations or future considerations
-                    6. Be formatted in a professional, easy-to-read style with clear headings
-                
-                Research findings to analyze:
-                {research_findings}
-                
-                Research report:
-                """
-            )
-            chain = prompt | self.llm
-            response = chain.invoke({
-                "research_topic": state["research_topic"],
+            response = await self._call_llm(self._analysis_chain, {
+                "research_topic": self._research_topic(state),
                 "research_findings": state["research_findings"]
             })
             
@@ -400,14 +803,47 @@ class ResearchAgent:
                 
             return {"research_report": response.content, "error": None}
         except Exception as e:
-            logger.error(f"Error in analyst node: {str(e)}")
+            logger.error("Error in analyst node: %s", e)
+            return {"research_report": "", "error": str(e)}
+    
+    async def _research_and_analysis_node(self, state: ResearchState) -> Dict[str, Any]:
+        """Research the extracted topic and write the report in a single step.
+        
+        This combines the researcher and analyst nodes into one LLM call.
+        
+        Args:
+            state: Current workflow state containing the research topic.
+            
+        Returns:
+            Dict[str, Any]: Updated state with research report or error.
+            
+        Raises:
+            ValueError: If report generation fails.
+        """
+        if state.get("error"):
+            return state
+            
+        try:
+            response = await self._call_llm(
+                self._research_and_analysis_chain, {"research_topic": self._research_topic(state)}
+            )
+            
+            if not response.content:
+                raise ValueError("Failed to generate research report")
+                
+            return {"research_report": response.content, "error": None}
+        except Exception as e:
+            logger.error("Error in research and analysis node: %s", e)
             return {"research_report": "", "error": str(e)}
     
     def invoke(self, query: str, session_id: str) -> AgentResponse:
         """Process a research query through the complete workflow.
         
-        This is the main entry point for the research agent. It handles the entire
-        research process from query validation to report generation.
+        This is a synchronous wrapper around ainvoke() for callers without an
+        event loop. The query runs on an event loop shared by all invoke()
+        calls, so that connections to the LLM provider are reused between
+        them; it blocks the calling thread, so avoid calling it from a
+        running event loop.
         
         Args:
             query: The user's research query.
@@ -427,46 +863,116 @@ class ResearchAgent:
                 "What is the impact of climate change on biodiversity?",
                 "session-123"
             )
-            if response["is_task_complete"]:
-                print(response["content"])
+            if response.is_task_complete:
+                print(response.content)
             else:
-                print(f"Error: {response['error']}")
+                print(f"Error: {response.error}")
             ```
         """
+        return asyncio.run_coroutine_threadsafe(
+            self.ainvoke(query, session_id), _get_invoke_loop()
+        ).result()
+    
+    async def ainvoke(self, query: str, session_id: str) -> AgentResponse:
+        """Process a research query through the complete workflow.
+        
+        This is the main entry point for the research agent. It handles the entire
+        research process from query validation to report generation. The LLM
+        calls are made asynchronously, so the event loop is not blocked.
+        
+        Identical queries (after normalizing case and whitespace) that arrive
+        while one is being researched wait for its report instead of running
+        the workflow again, even from different sessions.
+        
+        Args:
+            query: The user's research query.
+            session_id: Unique identifier for the research session.
+            
+        Returns:
+            AgentResponse containing the research results or error information.
+            
+        Example:
+            ```python
+            agent = ResearchAgent()
+            response = await agent.ainvoke(
+                "What is the impact of climate change on biodiversity?",
+                "session-123"
+            )
+            ```
+        """
+        now = time.time()
+        
         # Validate input
         if error := self._validate_input(query, session_id):
-            return {
-                'is_task_complete': False,
-                'content': 'Invalid input',
-                'error': error,
-                'session_id': session_id,
-                'timestamp': time.time()
-            }
-        
-        # Cleanup old sessions
-        self._cleanup_old_sessions()
+            return AgentResponse(
+                is_task_complete=False,
+                content='Invalid input',
+                error=error,
+                session_id=session_id,
+                timestamp=now
+            )
         
         try:
             # Process the query
-            config: RunnableConfig = {'configurable': {'thread_id': session_id}}
+            config: RunnableConfig = {'configurable': {'thread_id': session_id, 'agent': self}}
+            # Reset the topics of the session's previous query, which are
+            # not overwritten when the topic is not extracted.
             initial_state = {
                 "user_query": query,
-                "timestamp": time.time(),
+                "research_topic": "",
+                "research_topics": [],
+                "timestamp": now,
                 "error": None
             }
             
-            self._workflow.invoke(initial_state, config)
-            return self._get_agent_response(config, session_id)
+            key = ' '.join(query.lower().split())
+            final_state = await self._query_flight.do(
+                key, lambda: self._workflow.ainvoke(initial_state, config)
+            )
+            return self._build_response(final_state, session_id)
             
         except Exception as e:
-            logger.error(f"Error processing query: {str(e)}")
-            return {
-                'is_task_complete': False,
-                'content': 'An error occurred while processing your request',
-                'error': str(e),
-                'session_id': session_id,
-                'timestamp': time.time()
-            }
+            logger.error("Error processing query: %s", e)
+            return AgentResponse(
+                is_task_complete=False,
+                content='An error occurred while processing your request',
+                error=str(e),
+                session_id=session_id,
+                timestamp=time.time()
+            )
+    
+    async def abatch(self, queries: List[tuple[str, str]]) -> List[AgentResponse]:
+        """Process several research queries concurrently.
+        
+        The queries run through the workflow at the same time, at most
+        config.max_concurrency of them at once to stay within the LLM
+        provider's rate limits.
+        
+        Args:
+            queries: (query, session_id) pairs to process. Each pair should
+                use a distinct session ID.
+            
+        Returns:
+            List[AgentResponse]: The response for each query, in the same order.
+            
+        Example:
+            ```python
+            agent = ResearchAgent()
+            responses = await agent.abatch([
+                ("climate change", "session-1"),
+                ("quantum computing", "session-2"),
+            ])
+            ```
+        """
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        
+        async def run(query: str, session_id: str) -> AgentResponse:
+            async with semaphore:
+                return await self.ainvoke(query, session_id)
+        
+        return list(await asyncio.gather(
+            *(run(query, session_id) for query, session_id in queries)
+        ))
     
     async def stream(self, query: str, session_id: str) -> AsyncIterable[AgentResponse]:
         """Process a research query and stream updates as they occur.
@@ -497,6 +1003,8 @@ class ResearchAgent:
                 - error: Optional error message if something went wrong
                 - session_id: Session identifier
                 - timestamp: Unix timestamp of the update
+                - is_partial: True for chunks of the report, streamed as
+                  the model generates it
             
         Raises:
             ValueError: If the query is empty or exceeds MAX_QUERY_LENGTH,
@@ -510,131 +1018,182 @@ class ResearchAgent:
                 session_id = f"session-{uuid.uuid4()}"
                 try:
                     async for update in agent.stream(query, session_id):
-                        if update["is_complete"]:
+                        if update.is_task_complete:
                             print("Research complete!")
-                            print(f"Report: {update['content']}")
+                            print(f"Report: {update.content}")
                         else:
-                            print(f"Progress: {update['content']}")
-                        if update.get("error"):
-                            print(f"Error: {update['error']}")
+                            print(f"Progress: {update.content}")
+                        if update.error:
+                            print(f"Error: {update.error}")
                             break
                 except Exception as e:
                     print(f"Research failed: {str(e)}")
             ```
         """
+        now = time.time()
         try:
             # Add validation at the start
             if error := self._validate_input(query, session_id):
-                yield {
-                    'is_task_complete': False,
-                    'content': 'Invalid input',
-                    'error': error,
-                    'session_id': session_id,
-                    'timestamp': time.time()
-                }
+                yield AgentResponse(
+                    is_task_complete=False,
+                    content='Invalid input',
+                    error=error,
+                    session_id=session_id,
+                    timestamp=now
+                )
                 return
             
             # Initialize workflow state
-            config: RunnableConfig = {'configurable': {'thread_id': session_id}}
+            config: RunnableConfig = {'configurable': {'thread_id': session_id, 'agent': self}}
+            # Reset the topics of the session's previous query, which are
+            # not overwritten when the topic is not extracted.
             initial_state = {
                 "user_query": query,
-                "timestamp": time.time(),
+                "research_topic": "",
+                "research_topics": [],
+                "timestamp": now,
                 "error": None
             }
 
-            # Stream updates from each workflow stage
-            for item in self._workflow.stream(initial_state, config, stream_mode='updates'):
+            # Stream updates from each workflow stage, and the findings and
+            # report tokens as the model generates them. The last 'values' item
+            # is the final state, so it does not have to be read back from the
+            # checkpointer.
+            report_streamed = False
+            findings_streamed = False
+            fan_out = self.config.parallel_aspects
+            final_state: Dict[str, Any] = {}
+            async for mode, item in self._workflow.astream(
+                initial_state, config,
+                stream_mode=['updates', 'messages', 'values', 'custom'],
+            ):
+                if mode == 'values':
+                    final_state = item
+                    continue
+
+                # Progress written by the nodes themselves
+                if mode == 'custom':
+                    yield AgentResponse(
+                        is_task_complete=False,
+                        content=item,
+                        error=None,
+                        session_id=session_id,
+                        timestamp=time.time()
+                    )
+                    continue
+
+                if mode == 'messages':
+                    chunk, metadata = item
+                    if not isinstance(chunk.content, str) or not chunk.content:
+                        continue
+                    node = metadata.get('langgraph_node')
+                    if node in REPORT_NODES:
+                        report_streamed = True
+                        yield AgentResponse(
+                            is_task_complete=False,
+                            content=chunk.content,
+                            error=None,
+                            session_id=session_id,
+                            timestamp=time.time(),
+                            is_partial=True
+                        )
+                    # Sub-topics and aspects are researched concurrently, and
+                    # their tokens would arrive interleaved.
+                    elif node in FINDINGS_NODES and not fan_out:
+                        findings_streamed = True
+                        yield AgentResponse(
+                            is_task_complete=False,
+                            content=chunk.content,
+                            error=None,
+                            session_id=session_id,
+                            timestamp=time.time(),
+                            is_partial=True,
+                            is_findings=True
+                        )
+                    continue
+
                 if item.get("node_research_topic_extraction"):
-                    yield {
-                        'is_task_complete': False,
-                        'content': 'Extracting research topic...',
-                        'error': None,
-                        'session_id': session_id,
-                        'timestamp': time.time()
-                    }
-                elif item.get("node_researcher"):
-                    yield {
-                        'is_task_complete': False,
-                        'content': 'Conducting research...',
-                        'error': None,
-                        'session_id': session_id,
-                        'timestamp': time.time()
-                    }
-                elif item.get("node_analyst"):
-                    yield {
-                        'is_task_complete': False,
-                        'content': 'Generating research report...',
-                        'error': None,
-                        'session_id': session_id,
-                        'timestamp': time.time()
-                    }
+                    fan_out = fan_out or len(
+                        item["node_research_topic_extraction"].get("research_topics") or ()
+                    ) > 1
+                    yield AgentResponse(
+                        is_task_complete=False,
+                        content='Extracting research topic...',
+                        error=None,
+                        session_id=session_id,
+                        timestamp=time.time()
+                    )
+                elif item.get("node_researcher") and not findings_streamed:
+                    yield AgentResponse(
+                        is_task_complete=False,
+                        content='Conducting research...',
+                        error=None,
+                        session_id=session_id,
+                        timestamp=time.time()
+                    )
+                elif (
+                    item.get("node_analyst") or item.get("node_research_and_analysis")
+                ) and not report_streamed:
+                    yield AgentResponse(
+                        is_task_complete=False,
+                        content='Generating research report...',
+                        error=None,
+                        session_id=session_id,
+                        timestamp=time.time()
+                    )
 
             # Yield final response
-            yield self._get_agent_response(config, session_id)
+            yield self._build_response(final_state, session_id)
             
         except Exception as e:
-            logger.error(f"Error in streaming workflow: {str(e)}")
-            yield {
-                'is_task_complete': False,
-                'content': 'An error occurred during research',
-                'error': str(e),
-                'session_id': session_id,
-                'timestamp': time.time()
-            }
+            logger.error("Error in streaming workflow: %s", e)
+            yield AgentResponse(
+                is_task_complete=False,
+                content='An error occurred during research',
+                error=str(e),
+                session_id=session_id,
+                timestamp=time.time()
+            )
     
-    def _get_agent_response(self, config: RunnableConfig, session_id: str) -> AgentResponse:
-        """Get the agent response from the workflow state.
+    def _build_response(self, state: Dict[str, Any], session_id: str) -> AgentResponse:
+        """Build the agent response from the final workflow state.
         
         Args:
-            config: Workflow configuration containing the thread ID.
+            state: The workflow state after the last node ran.
             session_id: The session identifier.
             
         Returns:
             AgentResponse containing the research results or error information.
-            
-        Raises:
-            RuntimeError: If state retrieval fails.
         """
-        try:
-            state = self._workflow.get_state(config)
-            result = state.values.get('research_report')
-            error = state.values.get('error')
-            
-            if error:
-                return {
-                    'is_task_complete': False,
-                    'content': 'Research processing failed',
-                    'error': error,
-                    'session_id': session_id,
-                    'timestamp': time.time()
-                }
-            
-            if result:
-                return {
-                    'is_task_complete': True,
-                    'content': result,
-                    'error': None,
-                    'session_id': session_id,
-                    'timestamp': time.time()
-                }
-            
-            return {
-                'is_task_complete': False,
-                'content': 'Unable to generate research report',
-                'error': 'No research report generated',
-                'session_id': session_id,
-                'timestamp': time.time()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting agent response: {str(e)}")
-            return {
-                'is_task_complete': False,
-                'content': 'Error retrieving research results',
-                'error': str(e),
-                'session_id': session_id,
-                'timestamp': time.time()
-            }
+        result = state.get('research_report')
+        error = state.get('error')
+        now = time.time()
+        
+        if error:
+            return AgentResponse(
+                is_task_complete=False,
+                content='Research processing failed',
+                error=error,
+                session_id=session_id,
+                timestamp=now
+            )
+        
+        if result:
+            return AgentResponse(
+                is_task_complete=True,
+                content=result,
+                error=None,
+                session_id=session_id,
+                timestamp=now
+            )
+        
+        return AgentResponse(
+            is_task_complete=False,
+            content='Unable to generate research report',
+            error='No research report generated',
+            session_id=session_id,
+            timestamp=now
+        )
 
 # Example usage
 async def main():
@@ -662,14 +1221,24 @@ async def main():
         "What is the most important thing to do to fix the planet?",
         "test-session-123"
     ):
-        print(update['content'])
-        if update.get("error"):
-            print(f"Error: {update['error']}")
+        if update.is_partial:
+            print(update.content, end='', flush=True)
+            continue
+        print(update.content)
+        if update.error:
+            print(f"Error: {update.error}")
             break
-        if update["is_task_complete"]:
+        if update.is_task_complete:
             print("\nResearch complete!")
 
 # Run the async main function
 if __name__ == "__main__":
+    # Loading .env and configuring logging are up to the application; here
+    # that is this example.
+    load_dotenv()
+    logging.basicConfig(
+        level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper()),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     asyncio.run(main())
 
@@ -1,12 +1,14 @@
 import asyncio
 import logging
-import traceback
 import os
 from collections.abc import AsyncIterable
 
+from dotenv import load_dotenv
+
 from agent import ResearchAgent, AgentResponse
 from common.server import utils
 from common.server.task_manager import InMemoryTaskManager
+from common.server.task_store import TaskStore
 from common.types import (
     Artifact,
     InternalError,
@@ -44,18 +46,34 @@ class AgentTaskManager(InMemoryTaskManager):
     
     Attributes:
         agent: The ResearchAgent instance to handle research operations.
+        _run_semaphore: Limits the number of streaming tasks run at once;
+            further tasks wait for a slot.
+        _inflight: The streaming tasks being run. Holding them here keeps
+            them from being garbage collected before they finish.
     """
     
-    def __init__(self, agent: ResearchAgent):
+    def __init__(
+        self,
+        agent: ResearchAgent,
+        task_store: TaskStore | None = None,
+        max_concurrent_runs: int = 8,
+    ):
         """Initialize the AgentTaskManager.
         
         Args:
             agent: The ResearchAgent instance to use for research operations.
+            task_store: Where tasks are kept. If None, they are kept in memory.
+            max_concurrent_runs: Maximum number of streaming tasks run at
+                once.
         """
-        super().__init__()
+        super().__init__(task_store)
         self.agent = agent
+        self._run_semaphore = asyncio.Semaphore(max_concurrent_runs)
+        self._inflight: set[asyncio.Task] = set()
 
-    async def _run_streaming_agent(self, request: SendTaskStreamingRequest):
+    async def _run_streaming_agent(
+        self, request: SendTaskStreamingRequest, query: str
+    ):
         """Run the research agent in streaming mode.
         
         This method processes a research query through the agent's streaming
@@ -63,6 +81,7 @@ class AgentTaskManager(InMemoryTaskManager):
         
         Args:
             request: The streaming task request containing the query and parameters.
+            query: The user query, as extracted by _validate_request.
             
         The method handles:
             - Streaming updates from the research workflow
@@ -71,74 +90,112 @@ class AgentTaskManager(InMemoryTaskManager):
             - Error handling and reporting
         """
         task_send_params: TaskSendParams = request.params
-        query = self._get_user_query(task_send_params)
 
-        try:
-            async for update in self.agent.stream(
-                query, task_send_params.sessionId
-            ):
-                # Convert update to AgentResponse for type safety
-                response = AgentResponse(**update)
-                
-                # Prepare message parts
-                parts = [{'type': 'text', 'text': response['content']}]
-                message = Message(role='agent', parts=parts)
-                
-                # Determine task state and completion
-                if response['error']:
-                    task_state = TaskState.FAILED
-                    end_stream = True
-                    artifact = None
-                elif response['is_task_complete']:
-                    task_state = TaskState.COMPLETED
-                    end_stream = True
-                    artifact = Artifact(parts=parts, index=0, append=False)
-                else:
-                    task_state = TaskState.WORKING
-                    end_stream = False
-                    artifact = None
-
-                # Update task status
-                task_status = TaskStatus(state=task_state, message=message)
-                latest_task = await self.update_store(
+        # Tasks queue up here once max_concurrent_runs are running.
+        async with self._run_semaphore:
+            try:
+                # Report chunks are streamed as artifact 0 and findings chunks as
+                # artifact 1.
+                started_artifacts = set()
+
+                # Report the run as working before its first chunk; progress
+                # messages, which would otherwise do so, are not sent once
+                # the report is streamed.
+                task_status = TaskStatus(state=TaskState.WORKING)
+                await self.update_store(task_send_params.id, task_status, None)
+                stored_state = TaskState.WORKING
+                await self.enqueue_events_for_sse(
                     task_send_params.id,
-                    task_status,
-                    None if artifact is None else [artifact],
+                    TaskStatusUpdateEvent(
+                        id=task_send_params.id, status=task_status, final=False
+                    ),
                 )
 
-                # Send artifact update if available
-                if artifact:
-                    task_artifact_update_event = TaskArtifactUpdateEvent(
-                        id=task_send_params.id, artifact=artifact
+                async for response in self.agent.stream(
+                    query, task_send_params.sessionId
+                ):
+                    # Forward report and findings chunks as they are generated by
+                    # appending them to their artifact; the final response
+                    # replaces the report artifact with the complete report.
+                    # There is an event per token, and its contents are built
+                    # here, so pydantic validation is skipped.
+                    if response.is_partial:
+                        index = 1 if response.is_findings else 0
+                        artifact = Artifact.model_construct(
+                            name='Research findings' if response.is_findings else None,
+                            parts=[TextPart.model_construct(text=response.content)],
+                            index=index,
+                            append=index in started_artifacts,
+                            lastChunk=False,
+                        )
+                        started_artifacts.add(index)
+                        await self.enqueue_events_for_sse(
+                            task_send_params.id,
+                            TaskArtifactUpdateEvent.model_construct(
+                                id=task_send_params.id, artifact=artifact
+                            ),
+                        )
+                        continue
+
+                    # Prepare message parts
+                    parts = [{'type': 'text', 'text': response.content}]
+                    message = Message(role='agent', parts=parts)
+                
+                    # Determine task state and completion
+                    if response.error:
+                        task_state = TaskState.FAILED
+                        end_stream = True
+                        artifact = None
+                    elif response.is_task_complete:
+                        task_state = TaskState.COMPLETED
+                        end_stream = True
+                        artifact = Artifact(parts=parts, index=0, append=False)
+                    else:
+                        task_state = TaskState.WORKING
+                        end_stream = False
+                        artifact = None
+
+                    # Update task status. The store is only updated when the
+                    # state changes; further progress messages while working
+                    # are only sent to subscribers.
+                    task_status = TaskStatus(state=task_state, message=message)
+                    if task_state != stored_state:
+                        await self.update_store(
+                            task_send_params.id,
+                            task_status,
+                            None if artifact is None else [artifact],
+                        )
+                        stored_state = task_state
+
+                    # Send artifact update if available
+                    if artifact:
+                        task_artifact_update_event = TaskArtifactUpdateEvent(
+                            id=task_send_params.id, artifact=artifact
+                        )
+                        await self.enqueue_events_for_sse(
+                            task_send_params.id, task_artifact_update_event
+                        )
+
+                    # Send status update
+                    task_update_event = TaskStatusUpdateEvent(
+                        id=task_send_params.id,
+                        status=task_status,
+                        final=end_stream
                     )
                     await self.enqueue_events_for_sse(
-                        task_send_params.id, task_artifact_update_event
+                        task_send_params.id, task_update_event
                     )
 
-                # Send status update
-                task_update_event = TaskStatusUpdateEvent(
-                    id=task_send_params.id,
-                    status=task_status,
-                    final=end_stream
-                )
-                await self.enqueue_events_for_sse(
-                    task_send_params.id, task_update_event
-                )
-
-                # Break the stream if we've reached a terminal state
-                if end_stream:
-                    break
+                    # Break the stream if we've reached a terminal state
+                    if end_stream:
+                        break
 
-        except Exception as e:
-            logger.error(
-                'Error in streaming workflow: %s\n%s',
-                str(e),
-                traceback.format_exc()
-            )
-            error_message = f'An error occurred during research: {str(e)}'
-            await self._handle_streaming_error(
-                task_send_params.id, error_message
-            )
+            except Exception as e:
+                logger.exception('Error in streaming workflow: %s', e)
+                error_message = f'An error occurred during research: {str(e)}'
+                await self._handle_streaming_error(
+                    task_send_params.id, error_message
+                )
 
     async def _handle_streaming_error(
         self, task_id: str, error_message: str
@@ -177,14 +234,18 @@ class AgentTaskManager(InMemoryTaskManager):
 
     def _validate_request(
         self, request: SendTaskRequest | SendTaskStreamingRequest
-    ) -> JSONRPCResponse | None:
+    ) -> tuple[str | None, JSONRPCResponse | None]:
         """Validate the incoming request.
         
+        The user query is extracted here once, and returned so that it does
+        not have to be extracted again to process the request.
+        
         Args:
             request: The request to validate.
             
         Returns:
-            JSONRPCResponse with error if validation fails, None otherwise.
+            The user query and None if validation passes, or None and a
+            JSONRPCResponse with the error if it fails.
         """
         task_send_params: TaskSendParams = request.params
         
@@ -198,25 +259,25 @@ class AgentTaskManager(InMemoryTaskManager):
                 task_send_params.acceptedOutputModes,
                 self.agent.config.supported_content_types,
             )
-            return utils.new_incompatible_types_error(request.id)
+            return None, utils.new_incompatible_types_error(request.id)
 
         # Validate query
         try:
             query = self._get_user_query(task_send_params)
             if not query or len(query) > self.agent.config.max_query_length:
-                return JSONRPCResponse(
+                return None, JSONRPCResponse(
                     id=request.id,
                     error=InternalError(
                         message=f'Invalid query length. Maximum allowed: {self.agent.config.max_query_length}'
                     )
                 )
         except ValueError as e:
-            return JSONRPCResponse(
+            return None, JSONRPCResponse(
                 id=request.id,
                 error=InternalError(message=str(e))
             )
 
-        return None
+        return query, None
 
     async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
         """Handle synchronous task requests.
@@ -230,7 +291,7 @@ class AgentTaskManager(InMemoryTaskManager):
         Raises:
             ValueError: If the agent invocation fails.
         """
-        validation_error = self._validate_request(request)
+        query, validation_error = self._validate_request(request)
         if validation_error:
             return SendTaskResponse(id=request.id, error=validation_error.error)
 
@@ -242,15 +303,14 @@ class AgentTaskManager(InMemoryTaskManager):
         )
 
         task_send_params: TaskSendParams = request.params
-        query = self._get_user_query(task_send_params)
         
         try:
-            agent_response = self.agent.invoke(
+            agent_response = await self.agent.ainvoke(
                 query, task_send_params.sessionId
             )
             return await self._process_agent_response(request, agent_response)
         except Exception as e:
-            logger.error('Error invoking agent: %s\n%s', str(e), traceback.format_exc())
+            logger.exception('Error invoking agent: %s', e)
             raise ValueError(f'Error invoking agent: {str(e)}')
 
     async def on_send_task_subscribe(
@@ -265,7 +325,7 @@ class AgentTaskManager(InMemoryTaskManager):
             AsyncIterable of streaming responses or error response.
         """
         try:
-            error = self._validate_request(request)
+            query, error = self._validate_request(request)
             if error:
                 return error
 
@@ -278,17 +338,17 @@ class AgentTaskManager(InMemoryTaskManager):
             )
 
             # Start streaming task
-            asyncio.create_task(self._run_streaming_agent(request))
+            task = asyncio.create_task(
+                self._run_streaming_agent(request, query)
+            )
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
 
             return self.dequeue_events_for_sse(
                 request.id, task_send_params.id, sse_event_queue
             )
         except Exception as e:
-            logger.error(
-                'Error in SSE stream: %s\n%s',
-                str(e),
-                traceback.format_exc()
-            )
+            logger.exception('Error in SSE stream: %s', e)
             return JSONRPCResponse(
                 id=request.id,
                 error=InternalError(
@@ -313,16 +373,16 @@ class AgentTaskManager(InMemoryTaskManager):
         history_length = task_send_params.historyLength
 
         # Prepare message parts
-        parts = [{'type': 'text', 'text': agent_response['content']}]
+        parts = [{'type': 'text', 'text': agent_response.content}]
         
         # Determine task status based on response
-        if agent_response['error']:
+        if agent_response.error:
             task_status = TaskStatus(
                 state=TaskState.FAILED,
                 message=Message(role='agent', parts=parts)
             )
             artifact = None
-        elif agent_response['is_task_complete']:
+        elif agent_response.is_task_complete:
             task_status = TaskStatus(state=TaskState.COMPLETED)
             artifact = Artifact(parts=parts, index=0, append=False)
         else:
@@ -385,11 +445,7 @@ class AgentTaskManager(InMemoryTaskManager):
                 request.id, task_id_params.id, sse_event_queue
             )
         except Exception as e:
-            logger.error(
-                'Error while reconnecting to SSE stream: %s\n%s',
-                str(e),
-                traceback.format_exc()
-            )
+            logger.exception('Error while reconnecting to SSE stream: %s', e)
             return JSONRPCResponse(
                 id=request.id,
                 error=InternalError(
@@ -435,4 +491,5 @@ async def main():
         print(f"Error during streaming: {str(e)}")
 
 if __name__ == "__main__":
+    load_dotenv()
     asyncio.run(main())
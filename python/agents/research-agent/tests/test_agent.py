@@ -0,0 +1,111 @@
+import http.server
+import json
+import threading
+
+import pytest
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_openai import ChatOpenAI
+
+from common.utils.chat_model_factory import default_http_clients
+
+import agent
+from agent import AgentConfig, ResearchAgent
+
+
+@pytest.fixture(autouse=True)
+def fake_chat_model(monkeypatch):
+    """Replaces the LLM with one answering every prompt with a topic and two sub-topics."""
+    monkeypatch.setattr(
+        agent,
+        'create_chat_model',
+        lambda *args, **kwargs: FakeListChatModel(responses=['Topic\n- A\n- B']),
+    )
+
+
+def test_invoke_twice_with_more_llm_calls_than_the_limit():
+    # Each query researches two sub-topics concurrently with room for one
+    # LLM call at a time.
+    research_agent = ResearchAgent(
+        AgentConfig(max_llm_concurrency=1, max_subtopics=2)
+    )
+
+    for query in ('What is the first topic?', 'What is the second topic?'):
+        response = research_agent.invoke(query, 'session-1')
+
+        assert response.error is None
+        assert response.is_task_complete
+
+
+def test_topic_cache_drops_the_least_recently_used_topic(monkeypatch):
+    monkeypatch.setattr(agent, 'topic_cache', agent.TTLCache(maxsize=2, ttl=60))
+    research_agent = ResearchAgent(AgentConfig(fuse_topic_extraction=False))
+
+    for query in ('What is A?', 'What is B?', 'What is C?'):
+        research_agent.invoke(query, 'session-1')
+
+    assert len(agent.topic_cache) == 2
+    assert agent.topic_cache.get('research:topic:1:what is a?') is None
+    assert agent.topic_cache.get('research:topic:1:what is c?') is not None
+
+
+@pytest.fixture
+def openai_stub():
+    """Serves OpenAI chat completions on a local port, keeping connections alive."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            body = json.dumps({
+                'id': 'chatcmpl-1',
+                'object': 'chat.completion',
+                'created': 0,
+                'model': 'gpt-4o',
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': 'Topic\n- A\n- B'},
+                    'finish_reason': 'stop',
+                }],
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/v1'
+    server.shutdown()
+    server.server_close()
+
+
+def test_invoke_twice_with_the_shared_http_clients(monkeypatch, openai_stub):
+    # Without retries, a pooled connection left over from an event loop
+    # that is closed by now fails the second call.
+    http_client, http_async_client = default_http_clients()
+    monkeypatch.setattr(
+        agent,
+        'create_chat_model',
+        lambda *args, **kwargs: ChatOpenAI(
+            model='gpt-4o',
+            base_url=openai_stub,
+            api_key='test',
+            max_retries=0,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        ),
+    )
+    research_agent = ResearchAgent()
+
+    for query in ('What is the first topic?', 'What is the second topic?'):
+        response = research_agent.invoke(query, 'session-1')
+
+        assert response.error is None
+        assert response.is_task_complete
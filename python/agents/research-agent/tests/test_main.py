@@ -0,0 +1,40 @@
+import importlib.util
+import os
+
+import pytest
+
+
+# The entry point is the package's __main__ module, loaded from its file.
+spec = importlib.util.spec_from_file_location(
+    'research_agent_main',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), '__main__.py'),
+)
+entry_point = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(entry_point)
+
+
+def test_option_overrides_invalid_environment_value(monkeypatch):
+    monkeypatch.setenv('PORT', 'not-a-port')
+    monkeypatch.setenv('WORKERS', 'many')
+    monkeypatch.setenv('MAX_CONCURRENT_AGENTS', '-1')
+
+    args = entry_point.parse_args(
+        ['--port', '8080', '--workers', '2', '--max-concurrent-agents', '4']
+    )
+
+    assert (args.port, args.workers, args.max_concurrent_agents) == (8080, 2, 4)
+
+
+@pytest.mark.parametrize('name, value', [
+    ('PORT', 'not-a-port'), ('WORKERS', 'many'), ('WORKERS', '0'),
+    ('MAX_CONCURRENT_AGENTS', '0'),
+])
+def test_invalid_environment_value_is_a_usage_error(monkeypatch, capsys, name, value):
+    monkeypatch.setenv(name, value)
+
+    with pytest.raises(SystemExit) as exit_info:
+        entry_point.parse_args([])
+
+    assert exit_info.value.code == 2
+    option = name.lower().replace('_', '-')
+    assert f'argument --{option}' in capsys.readouterr().err
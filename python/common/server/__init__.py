@@ -1,5 +1,13 @@
 from .server import A2AServer
 from .task_manager import InMemoryTaskManager, TaskManager
+from .task_store import InMemoryTaskStore, RedisTaskStore, TaskStore
 
 
-__all__ = ['A2AServer', 'InMemoryTaskManager', 'TaskManager']
+__all__ = [
+    'A2AServer',
+    'InMemoryTaskManager',
+    'InMemoryTaskStore',
+    'RedisTaskStore',
+    'TaskManager',
+    'TaskStore',
+]
@@ -1,14 +1,26 @@
+import asyncio
+import errno
+import hashlib
+import importlib.util
 import json
 import logging
+import os
+import signal
+import socket
+import sys
 
 from collections.abc import AsyncIterable
+from functools import cached_property
 from typing import Any
 
+import orjson
+
 from pydantic import ValidationError
 from sse_starlette.sse import EventSourceResponse
 from starlette.applications import Starlette
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from common.server.task_manager import TaskManager
 from common.types import (
@@ -31,6 +43,37 @@ from common.types import (
 logger = logging.getLogger(__name__)
 
 
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, which is much faster than json."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+# Prefer uvloop and httptools from uvicorn[standard] (winloop on Windows,
+# where uvloop is unavailable); fall back to the stock asyncio loop and h11
+# parser otherwise.
+if importlib.util.find_spec('uvloop'):
+    EVENT_LOOP = 'uvloop'
+elif sys.platform == 'win32' and importlib.util.find_spec('winloop'):
+    EVENT_LOOP = 'winloop'
+else:
+    EVENT_LOOP = 'asyncio'
+HTTP_PROTOCOL = 'httptools' if importlib.util.find_spec('httptools') else 'h11'
+
+
+def _event_loop_factory():
+    if EVENT_LOOP == 'uvloop':
+        import uvloop
+
+        return uvloop.new_event_loop
+    if EVENT_LOOP == 'winloop':
+        import winloop
+
+        return winloop.new_event_loop
+    return None
+
+
 class A2AServer:
     def __init__(
         self,
@@ -39,13 +82,18 @@ class A2AServer:
         endpoint='/',
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        workers: int = 1,
     ):
         self.host = host
         self.port = port
+        self.workers = workers
         self.endpoint = endpoint
         self.task_manager = task_manager
         self.agent_card = agent_card
         self.app = Starlette()
+        # Compress larger JSON responses; GZipMiddleware leaves SSE streams
+        # uncompressed so events are flushed as soon as they are sent.
+        self.app.add_middleware(GZipMiddleware, minimum_size=1024)
         self.app.add_route(
             self.endpoint, self._process_request, methods=['POST']
         )
@@ -60,53 +108,231 @@ class A2AServer:
         if self.task_manager is None:
             raise ValueError('request_handler is not defined')
 
+        if self.workers > 1 and hasattr(os, 'fork'):
+            if hasattr(socket, 'SO_REUSEPORT'):
+                # A socket per worker lets the kernel balance new connections
+                # between workers instead of waking all of them on each one.
+                sockets = [
+                    self._bind_socket(reuse_port=True)
+                    for _ in range(self.workers)
+                ]
+            else:
+                sockets = [self._bind_socket()] * self.workers
+            self._run_workers(sockets)
+        else:
+            if self.workers > 1:
+                logger.warning(
+                    'Multiple workers require os.fork(), starting a single worker'
+                )
+            self._run(self._bind_socket())
+
+    async def serve(self, sockets: list[socket.socket] | None = None):
+        """Serves requests on the running event loop until shut down.
+
+        Args:
+            sockets: Bound listening sockets to accept connections on. If
+                None, a socket is bound to the server's host and port.
+        """
         import uvicorn
 
-        uvicorn.run(self.app, host=self.host, port=self.port)
+        config = uvicorn.Config(
+            self.app,
+            host=self.host,
+            port=self.port,
+            # The event loop is set up by the caller.
+            loop='none',
+            http=HTTP_PROTOCOL,
+        )
+        await uvicorn.Server(config).serve(
+            sockets=sockets or [self._bind_socket()]
+        )
 
-    def _get_agent_card(self, request: Request) -> JSONResponse:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    def _run(self, sock: socket.socket):
+        with asyncio.Runner(loop_factory=_event_loop_factory()) as runner:
+            runner.run(self.serve([sock]))
+
+    def _bind_socket(self, reuse_port: bool = False) -> socket.socket:
+        """Binds the listening socket, failing if the port is already in use.
+
+        Binding here rather than probing the port beforehand avoids a race
+        with other processes, and SO_REUSEADDR lets a restarted server bind
+        while connections of the previous one are still in TIME_WAIT.
+
+        Args:
+            reuse_port: Set SO_REUSEPORT so that several sockets can be bound
+                to the same port, one per worker process.
+        """
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        # On Windows SO_REUSEADDR would allow binding a port in active use.
+        if sys.platform != 'win32':
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        # Let returning clients send their request in the SYN. TCP_NODELAY is
+        # already set by asyncio on every accepted connection.
+        if sys.platform == 'linux' and hasattr(socket, 'TCP_FASTOPEN'):
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN, 256)
+            except OSError:
+                pass
+        try:
+            sock.bind((self.host, self.port))
+        except OSError as e:
+            sock.close()
+            if e.errno == errno.EADDRINUSE:
+                raise ValueError(f'Port {self.port} is not available') from e
+            raise
+        sock.set_inheritable(True)
+        return sock
+
+    def _run_workers(self, sockets: list[socket.socket]):
+        """Forks a worker process per socket to accept connections on it.
+
+        Each worker has its own copy of the task manager and its agent, and
+        nothing they keep in memory is shared: stream subscriptions, push
+        notification settings, the agent's conversation checkpoints and
+        caches. Connections are spread over the workers by the kernel, so
+        a session's requests may reach different workers, and a follow-up
+        message one without the conversation so far. A shared task store
+        such as RedisTaskStore only shares the task records, so that any
+        worker can answer tasks/get. Multi-turn sessions need single-worker
+        servers behind a load balancer with session affinity instead.
+        """
+        pids = []
+        for sock in sockets:
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    # Keep only this worker's socket open, so connections are
+                    # never routed to a socket nobody is accepting on.
+                    for other in sockets:
+                        if other is not sock:
+                            other.close()
+                    self._run(sock)
+                finally:
+                    os._exit(0)
+            pids.append(pid)
+        # The workers own the sockets now.
+        for sock in set(sockets):
+            sock.close()
+
+        def stop_workers(signum, frame):
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+        signal.signal(signal.SIGINT, stop_workers)
+        signal.signal(signal.SIGTERM, stop_workers)
+        logger.info('Started %d workers: %s', self.workers, pids)
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+    @cached_property
+    def _agent_card_json(self) -> tuple[bytes, str]:
+        """The agent card is static, so it is serialized only once."""
+        body = orjson.dumps(
+            self.agent_card.model_dump(mode='json', exclude_none=True)
+        )
+        return body, f'"{hashlib.sha256(body).hexdigest()}"'
+
+    def _get_agent_card(self, request: Request) -> Response:
+        body, etag = self._agent_card_json
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers={'ETag': etag})
+        return Response(
+            body, media_type='application/json', headers={'ETag': etag}
+        )
 
     async def _process_request(self, request: Request):
         try:
             body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
-
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.on_send_task_subscribe(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.on_cancel_task(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.on_set_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.on_get_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.on_resubscribe_to_task(
-                    json_rpc_request
-                )
-            else:
-                logger.warning(
-                    f'Unexpected request type: {type(json_rpc_request)}'
-                )
-                raise ValueError(f'Unexpected request type: {type(request)}')
+            if isinstance(body, list):
+                return await self._process_batch(body)
 
+            json_rpc_request = A2ARequest.validate_python(body)
+            result = await self._dispatch(json_rpc_request)
             return self._create_response(result)
 
         except Exception as e:
             return self._handle_exception(e)
 
+    async def _dispatch(self, json_rpc_request):
+        if isinstance(json_rpc_request, GetTaskRequest):
+            return await self.task_manager.on_get_task(json_rpc_request)
+        if isinstance(json_rpc_request, SendTaskRequest):
+            return await self.task_manager.on_send_task(json_rpc_request)
+        if isinstance(json_rpc_request, SendTaskStreamingRequest):
+            return await self.task_manager.on_send_task_subscribe(
+                json_rpc_request
+            )
+        if isinstance(json_rpc_request, CancelTaskRequest):
+            return await self.task_manager.on_cancel_task(json_rpc_request)
+        if isinstance(json_rpc_request, SetTaskPushNotificationRequest):
+            return await self.task_manager.on_set_task_push_notification(
+                json_rpc_request
+            )
+        if isinstance(json_rpc_request, GetTaskPushNotificationRequest):
+            return await self.task_manager.on_get_task_push_notification(
+                json_rpc_request
+            )
+        if isinstance(json_rpc_request, TaskResubscriptionRequest):
+            return await self.task_manager.on_resubscribe_to_task(
+                json_rpc_request
+            )
+        logger.warning(f'Unexpected request type: {type(json_rpc_request)}')
+        raise ValueError(f'Unexpected request type: {type(json_rpc_request)}')
+
+    async def _process_batch(self, body: list[Any]) -> JSONResponse:
+        """Handles a JSON-RPC batch, running its requests concurrently.
+
+        Each request gets its own response, in the order of the batch.
+        Streaming requests cannot be answered in a batch response and are
+        rejected individually.
+        """
+        if not body:
+            response = JSONRPCResponse(
+                id=None, error=InvalidRequestError(message='Empty batch')
+            )
+            return ORJSONResponse(
+                response.model_dump(exclude_none=True), status_code=400
+            )
+
+        responses = await asyncio.gather(
+            *(self._process_batch_item(item) for item in body)
+        )
+        return ORJSONResponse(
+            [response.model_dump(exclude_none=True) for response in responses]
+        )
+
+    async def _process_batch_item(self, item: Any) -> JSONRPCResponse:
+        try:
+            json_rpc_request = A2ARequest.validate_python(item)
+        except ValidationError as e:
+            return JSONRPCResponse(
+                id=item.get('id') if isinstance(item, dict) else None,
+                error=InvalidRequestError(data=json.loads(e.json())),
+            )
+
+        if isinstance(
+            json_rpc_request,
+            SendTaskStreamingRequest | TaskResubscriptionRequest,
+        ):
+            return JSONRPCResponse(
+                id=json_rpc_request.id,
+                error=InvalidRequestError(
+                    message='Streaming requests cannot be batched'
+                ),
+            )
+
+        try:
+            return await self._dispatch(json_rpc_request)
+        except Exception as e:
+            logger.error('Unhandled exception: %s', e)
+            return JSONRPCResponse(id=json_rpc_request.id, error=InternalError())
+
     def _handle_exception(self, e: Exception) -> JSONResponse:
         if isinstance(e, json.decoder.JSONDecodeError):
             json_rpc_error = JSONParseError()
@@ -117,7 +343,7 @@ class A2AServer:
             json_rpc_error = InternalError()
 
         response = JSONRPCResponse(id=None, error=json_rpc_error)
-        return JSONResponse(
+        return ORJSONResponse(
             response.model_dump(exclude_none=True), status_code=400
         )
 
@@ -126,12 +352,18 @@ class A2AServer:
     ) -> JSONResponse | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
+            # orjson encodes the events, which may carry a whole report, a
+            # few times faster than model_dump_json.
             async def event_generator(result) -> AsyncIterable[dict[str, str]]:
                 async for item in result:
-                    yield {'data': item.model_dump_json(exclude_none=True)}
+                    yield {
+                        'data': orjson.dumps(
+                            item.model_dump(exclude_none=True)
+                        ).decode()
+                    }
 
             return EventSourceResponse(event_generator(result))
         if isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            return ORJSONResponse(result.model_dump(exclude_none=True))
         logger.error(f'Unexpected result type: {type(result)}')
         raise ValueError(f'Unexpected result type: {type(result)}')
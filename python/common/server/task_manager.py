@@ -4,6 +4,7 @@ import logging
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterable
 
+from common.server.task_store import InMemoryTaskStore, TaskStore
 from common.server.utils import new_not_implemented_error
 from common.types import (
     Artifact,
@@ -81,8 +82,17 @@ class TaskManager(ABC):
 
 
 class InMemoryTaskManager(TaskManager):
-    def __init__(self):
-        self.tasks: dict[str, Task] = {}
+    """Task manager keeping tasks in a TaskStore, in memory by default.
+
+    Tasks are read and updated without holding a lock across the store's I/O:
+    each update is an atomic read-modify-write of one task by the store, so
+    updates of different tasks do not wait for each other, and concurrent
+    updates of the same task, even from other worker processes sharing the
+    store, are not lost.
+    """
+
+    def __init__(self, task_store: TaskStore | None = None):
+        self.task_store = task_store or InMemoryTaskStore()
         self.push_notification_infos: dict[str, PushNotificationConfig] = {}
         self.lock = asyncio.Lock()
         self.task_sse_subscribers: dict[str, list[asyncio.Queue]] = {}
@@ -92,14 +102,13 @@ class InMemoryTaskManager(TaskManager):
         logger.info(f'Getting task {request.params.id}')
         task_query_params: TaskQueryParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_query_params.id)
-            if task is None:
-                return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+        task = await self.task_store.get(task_query_params.id)
+        if task is None:
+            return GetTaskResponse(id=request.id, error=TaskNotFoundError())
 
-            task_result = self.append_task_history(
-                task, task_query_params.historyLength
-            )
+        task_result = self.append_task_history(
+            task, task_query_params.historyLength
+        )
 
         return GetTaskResponse(id=request.id, result=task_result)
 
@@ -109,12 +118,9 @@ class InMemoryTaskManager(TaskManager):
         logger.info(f'Cancelling task {request.params.id}')
         task_id_params: TaskIdParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_id_params.id)
-            if task is None:
-                return CancelTaskResponse(
-                    id=request.id, error=TaskNotFoundError()
-                )
+        task = await self.task_store.get(task_id_params.id)
+        if task is None:
+            return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
 
         return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
 
@@ -131,21 +137,21 @@ class InMemoryTaskManager(TaskManager):
     async def set_push_notification_info(
         self, task_id: str, notification_config: PushNotificationConfig
     ):
-        async with self.lock:
-            task = self.tasks.get(task_id)
-            if task is None:
-                raise ValueError(f'Task not found for {task_id}')
+        task = await self.task_store.get(task_id)
+        if task is None:
+            raise ValueError(f'Task not found for {task_id}')
 
+        async with self.lock:
             self.push_notification_infos[task_id] = notification_config
 
     async def get_push_notification_info(
         self, task_id: str
     ) -> PushNotificationConfig:
-        async with self.lock:
-            task = self.tasks.get(task_id)
-            if task is None:
-                raise ValueError(f'Task not found for {task_id}')
+        task = await self.task_store.get(task_id)
+        if task is None:
+            raise ValueError(f'Task not found for {task_id}')
 
+        async with self.lock:
             return self.push_notification_infos[task_id]
 
         return None
@@ -206,22 +212,21 @@ class InMemoryTaskManager(TaskManager):
 
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
         logger.info(f'Upserting task {task_send_params.id}')
-        async with self.lock:
-            task = self.tasks.get(task_send_params.id)
+
+        def upsert(task: Task | None) -> Task:
             if task is None:
-                task = Task(
+                return Task(
                     id=task_send_params.id,
                     sessionId=task_send_params.sessionId,
                     messages=[task_send_params.message],
                     status=TaskStatus(state=TaskState.SUBMITTED),
                     history=[task_send_params.message],
                 )
-                self.tasks[task_send_params.id] = task
-            else:
-                task.history.append(task_send_params.message)
-
+            task.history.append(task_send_params.message)
             return task
 
+        return await self.task_store.update(task_send_params.id, upsert)
+
     async def on_resubscribe_to_task(
         self, request: TaskResubscriptionRequest
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
@@ -230,10 +235,8 @@ class InMemoryTaskManager(TaskManager):
     async def update_store(
         self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
     ) -> Task:
-        async with self.lock:
-            try:
-                task = self.tasks[task_id]
-            except KeyError:
+        def update(task: Task | None) -> Task:
+            if task is None:
                 logger.error(f'Task {task_id} not found for updating the task')
                 raise ValueError(f'Task {task_id} not found')
 
@@ -249,6 +252,8 @@ class InMemoryTaskManager(TaskManager):
 
             return task
 
+        return await self.task_store.update(task_id, update)
+
     def append_task_history(self, task: Task, historyLength: int | None):
         new_task = task.model_copy()
         if historyLength is not None and historyLength > 0:
@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from common.types import Task
+
+
+class TaskStore(ABC):
+    @abstractmethod
+    async def get(self, task_id: str) -> Task | None:
+        pass
+
+    @abstractmethod
+    async def save(self, task: Task) -> None:
+        pass
+
+    @abstractmethod
+    async def update(
+        self, task_id: str, update: Callable[[Task | None], Task]
+    ) -> Task:
+        """Atomically reads, updates and saves a task.
+
+        Args:
+            task_id: The task to update.
+            update: Returns the task to save, given the stored task or None
+                if there is none. It may be called more than once, if the
+                task is changed by someone else in the meantime. Exceptions
+                it raises abort the update.
+
+        Returns:
+            The saved task.
+        """
+
+
+class InMemoryTaskStore(TaskStore):
+    def __init__(self):
+        self.tasks: dict[str, Task] = {}
+
+    async def get(self, task_id: str) -> Task | None:
+        return self.tasks.get(task_id)
+
+    async def save(self, task: Task) -> None:
+        self.tasks[task.id] = task
+
+    async def update(
+        self, task_id: str, update: Callable[[Task | None], Task]
+    ) -> Task:
+        # Nothing is awaited in between, so no other update can interleave.
+        task = update(self.tasks.get(task_id))
+        self.tasks[task.id] = task
+        return task
+
+
+class RedisTaskStore(TaskStore):
+    """Keeps tasks in Redis, so they survive restarts and any worker can read them.
+
+    Tasks are stored as JSON documents that expire `ttl` seconds after their
+    last update. Updates are atomic across workers: they are applied with
+    optimistic locking (WATCH/MULTI) and retried if the task changed
+    concurrently.
+    """
+
+    def __init__(
+        self, url: str, ttl: int | None = 24 * 60 * 60, prefix: str = 'task:'
+    ):
+        from redis.asyncio import Redis
+
+        self.redis = Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, task_id: str) -> Task | None:
+        data = await self.redis.get(self.prefix + task_id)
+        if data is None:
+            return None
+        return Task.model_validate_json(data)
+
+    async def save(self, task: Task) -> None:
+        await self.redis.set(
+            self.prefix + task.id, task.model_dump_json(), ex=self.ttl
+        )
+
+    async def update(
+        self, task_id: str, update: Callable[[Task | None], Task]
+    ) -> Task:
+        from redis.exceptions import WatchError
+
+        key = self.prefix + task_id
+        async with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    data = await pipe.get(key)
+                    task = update(
+                        None if data is None
+                        else Task.model_validate_json(data)
+                    )
+                    pipe.multi()
+                    pipe.set(key, task.model_dump_json(), ex=self.ttl)
+                    await pipe.execute()
+                    return task
+                except WatchError:
+                    continue
@@ -0,0 +1,66 @@
+"""Bounded in-memory LangGraph checkpointer."""
+
+import threading
+import time
+
+from collections import OrderedDict
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import MemorySaver
+
+
+class BoundedMemorySaver(MemorySaver):
+    """A MemorySaver that does not keep conversation threads forever.
+
+    At most `max_threads` threads are kept; the least recently used thread is
+    dropped when a new one would exceed the limit. Threads idle for longer
+    than `ttl` seconds are dropped on the next checkpoint write.
+    """
+
+    def __init__(self, max_threads: int = 1024, ttl: float | None = 24 * 60 * 60):
+        """Initialize the checkpointer.
+
+        Args:
+            max_threads: Maximum number of threads to keep in memory.
+            ttl: Idle time in seconds after which a thread is dropped. If None,
+                threads are only dropped when `max_threads` is exceeded.
+        """
+        super().__init__()
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self._last_used: OrderedDict[str, float] = OrderedDict()
+        self._last_used_lock = threading.Lock()
+
+    def get_tuple(self, config: RunnableConfig):
+        self._touch(config['configurable']['thread_id'])
+        return super().get_tuple(config)
+
+    def put(self, config: RunnableConfig, checkpoint, metadata, new_versions):
+        thread_id = config['configurable']['thread_id']
+        self._touch(thread_id)
+        for expired_thread_id in self._evict(keep=thread_id):
+            self.delete_thread(expired_thread_id)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def _touch(self, thread_id: str) -> None:
+        with self._last_used_lock:
+            self._last_used[thread_id] = time.monotonic()
+            self._last_used.move_to_end(thread_id)
+
+    def _evict(self, keep: str) -> list[str]:
+        """Returns the threads that are over the limit or idle for too long."""
+        expired = []
+        with self._last_used_lock:
+            cutoff = None if self.ttl is None else time.monotonic() - self.ttl
+            for thread_id, last_used in self._last_used.items():
+                if thread_id == keep:
+                    break
+                if len(self._last_used) - len(expired) > self.max_threads or (
+                    cutoff is not None and last_used < cutoff
+                ):
+                    expired.append(thread_id)
+                else:
+                    break
+            for thread_id in expired:
+                del self._last_used[thread_id]
+        return expired
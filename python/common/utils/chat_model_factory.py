@@ -1,34 +1,135 @@
+import functools
+import importlib.util
 import os
+import httpx
+from langchain_core.caches import BaseCache
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain.chat_models import init_chat_model
 from langchain_openai import AzureChatOpenAI
 
-def create_chat_model() -> BaseChatModel:
+@functools.cache
+def _llm_cache() -> BaseCache | None:
+    """
+    Returns the LLM response cache selected by the LLM_CACHE_BACKEND environment variable,
+    shared by all chat models in the process.
+
+    Backends:
+        memory: Exact-match cache in process memory.
+        sqlite: Exact-match cache in the SQLite database at LLM_CACHE_PATH (default: .llm_cache.db).
+        redis: Exact-match cache in Redis at REDIS_URL (default: redis://localhost:6379).
+
+    Returns:
+        The cache, or None if LLM_CACHE_BACKEND is not set.
+    Raises:
+        ValueError: If LLM_CACHE_BACKEND is not one of the backends above.
+    """
+    backend = os.getenv('LLM_CACHE_BACKEND', '').lower()
+    redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
+
+    if not backend:
+        return None
+    if backend == 'memory':
+        from langchain_core.caches import InMemoryCache
+
+        return InMemoryCache()
+    if backend == 'sqlite':
+        from langchain_community.cache import SQLiteCache
+
+        return SQLiteCache(database_path=os.getenv('LLM_CACHE_PATH', '.llm_cache.db'))
+    if backend == 'redis':
+        from langchain_community.cache import RedisCache
+        from redis import Redis
+
+        return RedisCache(redis_=Redis.from_url(redis_url))
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND: {backend}")
+
+@functools.cache
+def default_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Returns the httpx clients shared by chat models created without clients of their own.
+
+    Sharing them keeps connections to the provider alive between requests of all models,
+    instead of paying for a TCP and TLS handshake on each model's first calls. They use
+    HTTP/2 when the h2 package is installed (httpx[http2]), so concurrent requests can
+    share a connection.
+
+    Returns:
+        The sync and the async client, created on the first call.
+    """
+    http2 = importlib.util.find_spec('h2') is not None
+    limits = httpx.Limits(
+        max_keepalive_connections=200, max_connections=500, keepalive_expiry=60
+    )
+    return (
+        httpx.Client(limits=limits, http2=http2),
+        httpx.AsyncClient(limits=limits, http2=http2),
+    )
+
+def create_chat_model(
+    model_name: str | None = None,
+    http_client: httpx.Client | None = None,
+    http_async_client: httpx.AsyncClient | None = None,
+) -> BaseChatModel:
     """
     Creates and returns an instance of a provider-specific chat model based on the environment configuration.
     The function determines the model provider and initializes the appropriate chat model.
     It supports both Azure and other providers specified via environment variables.
+    Responses are cached when LLM_CACHE_BACKEND is set, see _llm_cache. A cache hit replays the
+    earlier response regardless of the model's temperature, so enable it for deterministic use.
+
+    Models are created once per configuration: calls with the same model, environment settings
+    and clients return the same instance, sharing its connection pool.
     
+    Args:
+        model_name: Optional name of the model (the deployment name on Azure). If None,
+            uses the CHAT_MODEL environment variable.
+        http_client: Optional httpx client for sync requests to the OpenAI and Azure providers.
+            If None, the client shared by all models is used, see default_http_clients.
+        http_async_client: Optional httpx client for async requests to the OpenAI and Azure providers.
+            If None, the client shared by all models is used.
+
     Returns:
-        An instance of the chat model initialized with the specified configuration.
+        An instance of the chat model initialized with the specified configuration, shared
+        with other callers using the same configuration.
     Raises:
         ValueError: If the Azure configuration is incomplete (missing AZURE_OPENAI_ENDPOINT or AZURE_OPENAI_API_VERSION).
         ValueError: If the model name is not specified (missing CHAT_MODEL environment variable).
+        ValueError: If LLM_CACHE_BACKEND is set to an unknown backend.
     """
-    model_name = os.getenv('CHAT_MODEL', 'gpt-4o')
-    model_provider = os.getenv('CHAT_MODEL_PROVIDER', 'openai')
+    return _create_chat_model(
+        model_name or os.getenv('CHAT_MODEL', 'gpt-4o'),
+        os.getenv('CHAT_MODEL_PROVIDER', 'openai'),
+        os.getenv("AZURE_OPENAI_ENDPOINT"),
+        os.getenv("AZURE_OPENAI_API_VERSION"),
+        http_client,
+        http_async_client,
+    )
 
-    if model_provider == 'azure':
-        azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        azure_api_version = os.getenv("AZURE_OPENAI_API_VERSION")
+@functools.lru_cache(maxsize=None)
+def _create_chat_model(
+    model_name: str,
+    model_provider: str,
+    azure_endpoint: str | None,
+    azure_api_version: str | None,
+    http_client: httpx.Client | None,
+    http_async_client: httpx.AsyncClient | None,
+) -> BaseChatModel:
+    client_kwargs = {}
+    if model_provider in ('openai', 'azure'):
+        default_client, default_async_client = default_http_clients()
+        client_kwargs['http_client'] = http_client or default_client
+        client_kwargs['http_async_client'] = http_async_client or default_async_client
 
+    if model_provider == 'azure':
         if not azure_endpoint or not azure_api_version:
             raise ValueError("Azure configuration is incomplete. Ensure AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_API_VERSION are set.")
 
         chat_model = AzureChatOpenAI(
             azure_endpoint=azure_endpoint,
             azure_deployment=model_name,
-            openai_api_version=azure_api_version
+            openai_api_version=azure_api_version,
+            cache=_llm_cache(),
+            **client_kwargs,
         )
     else:
         if not model_name:
@@ -37,6 +138,8 @@ def create_chat_model() -> BaseChatModel:
         chat_model = init_chat_model(
             model=model_name,
             model_provider=model_provider,
+            cache=_llm_cache(),
+            **client_kwargs,
         )
 
     return chat_model
@@ -0,0 +1,47 @@
+"""Duplicate call suppression utility."""
+
+import asyncio
+
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+
+T = TypeVar('T')
+
+
+class SingleFlight(Generic[T]):
+    """Runs at most one call per key at a time, sharing its result.
+
+    Callers that ask for a key while a call for it is already in flight wait
+    for that call instead of starting their own, so N concurrent identical
+    requests cost one round trip rather than N. Once the call completes the
+    key is forgotten; caching the result is up to the caller.
+
+    The call runs in its own task, so a cancelled caller does not cancel it
+    for the others waiting on the same key. Calls are only shared between
+    callers on the same event loop.
+    """
+
+    def __init__(self):
+        self._calls: dict[
+            tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task[T]
+        ] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Returns the result of fn(), or of the call in flight for key.
+
+        Args:
+            key: Identifies calls that are interchangeable with each other.
+            fn: Starts the call when none is in flight for key.
+
+        Returns:
+            The result of the call. Exceptions raised by the call are raised
+            to every caller waiting on it.
+        """
+        call_key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(call_key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[call_key] = task
+            task.add_done_callback(lambda _: self._calls.pop(call_key, None))
+        return await asyncio.shield(task)
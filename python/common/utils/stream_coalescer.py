@@ -0,0 +1,93 @@
+"""Stream update coalescing utility."""
+
+import asyncio
+import logging
+
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_DONE = object()
+
+
+async def coalesce_updates(
+    updates: AsyncIterable[T],
+    window: float = 0.05,
+    max_batch: int = 8,
+    maxsize: int = 64,
+) -> AsyncIterator[T]:
+    """Coalesce bursts of progress updates into a single update.
+
+    The source is drained by a background task into a bounded queue. Updates
+    that arrive within `window` seconds of each other (up to `max_batch` of
+    them) are collapsed into the most recent one, since each progress update
+    supersedes the previous one. This cuts the number of events sent to the
+    client when a graph emits several steps in quick succession.
+
+    The queue is bounded, so a source that outpaces the consumer is paused
+    rather than buffered without limit. A warning is logged when the queue
+    stays above 80% of `maxsize` for more than a second.
+
+    Args:
+        updates: The source of progress updates.
+        window: Time in seconds to wait for further updates before yielding.
+        max_batch: Maximum number of updates collapsed into one.
+        maxsize: Maximum number of updates buffered from the source.
+
+    Yields:
+        The latest update of each burst.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    error: Exception | None = None
+    loop = asyncio.get_running_loop()
+
+    async def produce() -> None:
+        nonlocal error
+        backlogged_since = None
+        try:
+            async for update in updates:
+                await queue.put(update)
+                if queue.qsize() <= 0.8 * maxsize:
+                    backlogged_since = None
+                elif backlogged_since is None:
+                    backlogged_since = loop.time()
+                elif loop.time() - backlogged_since >= 1:
+                    logger.warning(
+                        'Stream consumer is falling behind, %d of %d updates queued',
+                        queue.qsize(), maxsize,
+                    )
+                    backlogged_since = loop.time()
+        except Exception as e:
+            error = e
+        await queue.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        done = False
+        while not done:
+            latest = await queue.get()
+            if latest is _DONE:
+                break
+            deadline = loop.time() + window
+            for _ in range(max_batch - 1):
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    update = await asyncio.wait_for(queue.get(), timeout)
+                except TimeoutError:
+                    break
+                if update is _DONE:
+                    done = True
+                    break
+                latest = update
+            yield latest
+
+        if error is not None:
+            raise error
+    finally:
+        producer.cancel()
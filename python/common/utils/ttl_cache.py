@@ -0,0 +1,65 @@
+"""Bounded in-memory cache with expiring entries."""
+
+import threading
+import time
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class TTLCache:
+    """A thread-safe cache of at most `maxsize` entries that expire after `ttl` seconds.
+
+    The least recently used entry is dropped when a new one would exceed the
+    limit. Expired entries are dropped when they are read, and those that are
+    also the least recently used when a new entry is stored, so entries that
+    are never read again do not pile up.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries to keep.
+            ttl: Time in seconds after which an entry expires.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value cached for key, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Caches value for key, dropping the least recently used entry if full."""
+        with self._lock:
+            now = time.monotonic()
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            while self._entries:
+                oldest_key = next(iter(self._entries))
+                if self._entries[oldest_key][0] > now:
+                    break
+                del self._entries[oldest_key]
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)